@@ -0,0 +1,161 @@
+import hashlib
+import json
+import os
+from collections import OrderedDict
+
+import numpy as np
+
+from model.forest import MODEL_VERSION
+
+
+# Arguments sans effet sur le résultat : exclus de la clé
+IGNORED_ARGS = ("progress", "workers", "profile")
+# entrées des résultats propres à une exécution (mesures de temps) : jamais
+# mises en cache, un résultat relu ne doit pas présenter d'anciennes mesures
+# comme actuelles
+VOLATILE_KEYS = ("profile",)
+
+
+def _default_directory():
+    return os.environ.get("PERCOLATION_CACHE",
+                          os.path.join(os.path.expanduser("~"), ".cache", "percolation"))
+
+
+def _encode(obj):
+    """Encodage JSON préservant tuples et scalaires NumPy (aller-retour exact)."""
+    if isinstance(obj, tuple):
+        return {"__tuple__": [_encode(x) for x in obj]}
+    if isinstance(obj, list):
+        return [_encode(x) for x in obj]
+    if isinstance(obj, dict):
+        return {k: _encode(v) for k, v in obj.items()}
+    if isinstance(obj, np.ndarray):
+        return [_encode(x) for x in obj.tolist()]
+    if isinstance(obj, np.generic):
+        return obj.item()
+    return obj
+
+
+def _decode(obj):
+    if isinstance(obj, dict):
+        if "__tuple__" in obj:
+            return tuple(_decode(x) for x in obj["__tuple__"])
+        return {k: _decode(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [_decode(x) for x in obj]
+    return obj
+
+
+class ResultCache:
+    """
+    Cache de résultats adressé par contenu, à deux niveaux :
+    - mémoire : les `memory_items` derniers résultats utilisés,
+    - disque  : un fichier JSON par résultat, total borné à `max_bytes`.
+    Éviction LRU sur les deux niveaux (sur disque : date de dernière utilisation).
+
+    La clé est le hash de (fonction, arguments, MODEL_VERSION) : changer de
+    version du modèle invalide les anciens résultats.
+    """
+
+    def __init__(self, directory=None, max_bytes=64 * 1024 * 1024, memory_items=256):
+        self.directory = directory if directory is not None else _default_directory()
+        self.max_bytes = int(max_bytes)
+        self.memory_items = int(memory_items)
+        self._memory = OrderedDict()
+
+    # ---------- clés ----------
+    @staticmethod
+    def key(func, kwargs):
+        args = {k: v for k, v in kwargs.items() if k not in IGNORED_ARGS}
+        payload = json.dumps(
+            {"func": f"{func.__module__}.{func.__qualname__}", "version": MODEL_VERSION, "args": _encode(args)},
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], key + ".json")
+
+    # ---------- accès ----------
+    def get(self, key, default=None):
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            return self._memory[key]
+
+        path = self._path(key)
+        try:
+            with open(path, encoding="utf-8") as f:
+                value = _decode(json.load(f))
+        except (OSError, ValueError):
+            return default
+
+        os.utime(path)  # marque l'entrée comme récemment utilisée
+        self._remember(key, value)
+        return value
+
+    def put(self, key, value):
+        self._remember(key, value)
+
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(_encode(value), f)
+        os.replace(tmp, path)
+
+        self._evict_disk()
+
+    def call(self, func, **kwargs):
+        """
+        func(**kwargs) mémorisé. Seuls les appels avec un seed fixé sont mis
+        en cache (sans seed, chaque appel doit donner un nouveau tirage).
+        """
+        if kwargs.get("seed") is None:
+            return func(**kwargs)
+
+        key = self.key(func, kwargs)
+        miss = object()
+        value = self.get(key, miss)
+        if value is miss:
+            value = func(**kwargs)
+            if isinstance(value, dict):
+                self.put(key, {k: v for k, v in value.items() if k not in VOLATILE_KEYS})
+            else:
+                self.put(key, value)
+        return value
+
+    def clear(self):
+        self._memory.clear()
+        for path, _, _ in self._entries():
+            os.remove(path)
+
+    # ---------- éviction ----------
+    def _remember(self, key, value):
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+
+    def _entries(self):
+        """(chemin, taille, date d'utilisation) de chaque entrée sur disque."""
+        out = []
+        if not os.path.isdir(self.directory):
+            return out
+        for sub in os.listdir(self.directory):
+            d = os.path.join(self.directory, sub)
+            if not os.path.isdir(d):
+                continue
+            for name in os.listdir(d):
+                if name.endswith(".json"):
+                    st = os.stat(os.path.join(d, name))
+                    out.append((os.path.join(d, name), st.st_size, st.st_mtime))
+        return out
+
+    def _evict_disk(self):
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        for path, size, _ in sorted(entries, key=lambda e: e[2]):
+            if total <= self.max_bytes:
+                break
+            os.remove(path)
+            total -= size
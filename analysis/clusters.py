@@ -0,0 +1,200 @@
+"""
+Amas d'arbres sur tout le réseau (algorithme de Hoshen–Kopelman, ligne par ligne).
+
+Le terrain est lu une seule fois, par blocs de lignes (Forest.iter_row_blocks,
+TiledForest.iter_row_blocks ou un tableau n×n comme Forest.initial_grid) ;
+la mémoire de travail est en O(n) : seuls les amas touchant la ligne courante
+sont gardés, un amas est compté dès qu'il ne peut plus grandir.
+
+Chaque ligne est découpée en segments d'arbres consécutifs (déjà connexes) ;
+un segment est relié aux segments de la ligne précédente qui le touchent
+(recouvrement de colonnes en 4 voisins, recouvrement à une colonne près
+en 8 voisins). Les fusions d'une ligne sont résolues d'un coup sur ce petit
+graphe (composantes connexes par accrochage + compression de chemins).
+
+Statistiques : distribution des tailles d'amas, fraction du plus grand amas,
+amas traversants haut–bas et gauche–droite, taille moyenne des amas finis.
+"""
+import numpy as np
+
+from model.forest import Forest
+
+
+TOP, BOTTOM, LEFT, RIGHT = 1, 2, 4, 8
+
+
+def _runs(row):
+    """Segments [start, end) d'arbres consécutifs d'une ligne booléenne."""
+    edges = np.diff(np.concatenate(([0], row.view(np.int8), [0])))
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+
+def _components(size, u, v):
+    """Racine (plus petit indice) de la composante de chaque nœud, arêtes (u, v)."""
+    parent = np.arange(size)
+    if u.size == 0:
+        return parent
+    while True:
+        pu, pv = parent[u], parent[v]
+        lo, hi = np.minimum(pu, pv), np.maximum(pu, pv)
+        todo = lo != hi
+        if not todo.any():
+            return parent
+        np.minimum.at(parent, hi[todo], lo[todo])
+        while True:
+            jumped = parent[parent]
+            if np.array_equal(jumped, parent):
+                break
+            parent = jumped
+
+
+def _as_blocks(terrain):
+    """Blocs de lignes booléens (arbre = True) depuis un tableau ou un itérable de blocs."""
+    if isinstance(terrain, np.ndarray):
+        terrain = (terrain,)
+    for block in terrain:
+        block = np.asarray(block)
+        yield block if block.dtype == bool else block == Forest.TREE
+
+
+class ClusterStats:
+    """Résultat de cluster_stats (tailles d'amas finis et amas traversants)."""
+
+    def __init__(self, n_rows, n_cols):
+        self.n_rows = n_rows
+        self.n_cols = n_cols
+        self.counts = {}          # taille -> nombre d'amas
+        self.trees = 0
+        self.largest = 0
+        self.spans_top_bottom = False
+        self.spans_left_right = False
+        self._finite_s1 = 0       # Σ s   sur les amas non traversants
+        self._finite_s2 = 0       # Σ s²  sur les amas non traversants
+
+    def _add(self, sizes, flags):
+        if sizes.size == 0:
+            return
+        tb = (flags & (TOP | BOTTOM)) == (TOP | BOTTOM)
+        lr = (flags & (LEFT | RIGHT)) == (LEFT | RIGHT)
+        self.spans_top_bottom |= bool(tb.any())
+        self.spans_left_right |= bool(lr.any())
+        self.trees += int(sizes.sum())
+        self.largest = max(self.largest, int(sizes.max()))
+
+        finite = sizes[~(tb | lr)].astype(np.float64)
+        self._finite_s1 += float(finite.sum())
+        self._finite_s2 += float((finite * finite).sum())
+
+        for s, c in zip(*np.unique(sizes, return_counts=True)):
+            self.counts[int(s)] = self.counts.get(int(s), 0) + int(c)
+
+    def size_distribution(self):
+        """(tailles, nombres d'amas) triés par taille."""
+        sizes = np.array(sorted(self.counts), dtype=np.int64)
+        return sizes, np.array([self.counts[s] for s in sizes], dtype=np.int64)
+
+    def as_dict(self):
+        cells = self.n_rows * self.n_cols
+        return {
+            "clusters": sum(self.counts.values()),
+            "trees": self.trees,
+            "largest": self.largest,
+            "largest_fraction": self.largest / cells if cells else 0.0,
+            "spans_top_bottom": self.spans_top_bottom,
+            "spans_left_right": self.spans_left_right,
+            # S = Σ s² n_s / Σ s n_s (amas traversants exclus)
+            "mean_cluster_size": self._finite_s2 / self._finite_s1 if self._finite_s1 else 0.0,
+        }
+
+
+def cluster_stats(terrain, neighbors=4):
+    """
+    Étiquetage de Hoshen–Kopelman en une passe, ligne par ligne.
+    terrain : tableau n×n (Forest.initial_grid, masque booléen) ou itérable
+    de blocs de lignes (Forest.iter_row_blocks(), TiledForest.iter_row_blocks()).
+    neighbors : 4 ou 8 (comme Forest.neighbors).
+    Renvoie un ClusterStats.
+    """
+    if neighbors not in (4, 8):
+        raise ValueError(f"voisinage inconnu : {neighbors!r} (attendu : 4, 8)")
+    reach = 1 if neighbors == 8 else 0
+
+    stats = None
+    # ligne précédente : segments, amas de chaque segment ; amas actifs : taille, bords touchés
+    prev_start = prev_end = prev_label = np.empty(0, dtype=np.int64)
+    size = flags = np.empty(0, dtype=np.int64)
+    r = 0
+
+    for block in _as_blocks(terrain):
+        if stats is None:
+            stats = ClusterStats(0, block.shape[1])
+        n_cols = stats.n_cols
+        for row in block:
+            start, end = _runs(row)
+            k, m = size.size, start.size
+
+            # segments de la ligne précédente touchant chaque segment courant
+            lo = np.searchsorted(prev_end, start - reach, side="right")
+            hi = np.searchsorted(prev_start, end + reach, side="left")
+            deg = np.maximum(hi - lo, 0)
+            cur = np.repeat(np.arange(m), deg)
+            prev = np.arange(deg.sum()) - np.repeat(np.cumsum(deg) - deg, deg) + np.repeat(lo, deg)
+
+            # nœuds : amas actifs 0..k-1 puis segments courants k..k+m-1
+            root = _components(k + m, k + cur, prev_label[prev])
+
+            run_flags = np.where(start == 0, LEFT, 0) | np.where(end == n_cols, RIGHT, 0)
+            if r == 0:
+                run_flags |= TOP
+            node_size = np.concatenate((size, end - start))
+            node_flags = np.concatenate((flags, run_flags))
+
+            comp_size = np.bincount(root, weights=node_size, minlength=k + m).astype(np.int64)
+            comp_flags = np.zeros(k + m, dtype=np.int64)
+            np.bitwise_or.at(comp_flags, root, node_flags)
+
+            # composantes sans segment sur la ligne courante : amas terminés
+            alive = np.zeros(k + m, dtype=bool)
+            alive[root[k:]] = True
+            done = np.flatnonzero((root == np.arange(k + m)) & ~alive)
+            stats._add(comp_size[done], comp_flags[done])
+
+            # renumérotation compacte des amas actifs
+            roots = np.flatnonzero(alive)
+            new_id = np.empty(k + m, dtype=np.int64)
+            new_id[roots] = np.arange(roots.size)
+            prev_start, prev_end, prev_label = start, end, new_id[root[k:]]
+            size, flags = comp_size[roots], comp_flags[roots]
+            r += 1
+
+    if stats is None:
+        return ClusterStats(0, 0)
+    stats.n_rows = r
+    # amas encore actifs : ils touchent la dernière ligne
+    stats._add(size, flags | BOTTOM)
+    return stats
+
+
+def cluster_curve(n, densities, neighbors=4, realizations=10, seed=None, progress=None):
+    """
+    Observables d'amas en fonction de la densité (moyennes sur realizations terrains) :
+    fraction du plus grand amas, taille moyenne des amas finis, probabilités
+    de traversée haut–bas / gauche–droite. Terrains de Forest (même seed que theta_curve).
+    progress(curve) : appelé avec la courbe partielle après chaque densité.
+    """
+    curve = []
+    for d in densities:
+        rows = []
+        for ss in np.random.SeedSequence(seed).spawn(realizations):
+            forest = Forest(n, d, neighbors=neighbors, rng=np.random.default_rng(ss))
+            rows.append(cluster_stats(forest.iter_row_blocks(), neighbors).as_dict())
+        curve.append({
+            "density": d,
+            "largest_fraction": float(np.mean([x["largest_fraction"] for x in rows])),
+            "mean_cluster_size": float(np.mean([x["mean_cluster_size"] for x in rows])),
+            "spans_top_bottom": float(np.mean([x["spans_top_bottom"] for x in rows])),
+            "spans_left_right": float(np.mean([x["spans_left_right"] for x in rows])),
+        })
+        if progress is not None:
+            progress(list(curve))
+    return curve
@@ -0,0 +1,146 @@
+"""
+θ(d) par nombres aléatoires communs (échantillonnage couplé).
+
+Une réalisation tire une fois pour toutes :
+- un champ uniforme U (n, n) : la case est un arbre à la densité d si U < d,
+- si p_fire < 1, une uniforme V par (case, direction) : la case en feu
+  enflamme son voisin dans cette direction si V < p_fire.
+
+Chaque arête orientée n'est tentée qu'une fois (une case ne brûle qu'un pas),
+ce qui redonne exactement la loi du modèle (allumage avec probabilité
+1 - (1 - p_fire)^k pour k voisins en feu). Toutes les densités partagent
+alors les mêmes tirages : la courbe est croissante réalisation par réalisation
+et ses écarts entre densités ont la variance minimale.
+"""
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from model.forest import NEIGHBOR_OFFSETS, _shifted
+from analysis.ensemble import default_batch
+
+
+def _reaches_corner(tree, opened, offsets, start_cell):
+    """
+    Propagation du feu (dilatation du front) sur une pile de terrains (R, n, n) :
+    renvoie, pour chaque réplique, si le coin est atteint.
+    opened : (R, K, n, n) arêtes ouvertes par direction, ou None (p_fire = 1).
+    """
+    n = tree.shape[-1]
+    front = np.zeros(tree.shape, dtype=bool)
+    front[:, start_cell[0], start_cell[1]] = tree[:, start_cell[0], start_cell[1]]
+    reached = front.copy()
+    hit = front[:, n - 1, n - 1].copy()  # départ sur le coin
+    new = np.empty_like(front)
+    src = np.empty_like(front)
+    tmp = np.empty_like(front)
+
+    while (front.any(axis=(1, 2)) & ~hit).any():
+        new[...] = False
+        for k, (di, dj) in enumerate(offsets):
+            if opened is None:
+                new |= _shifted(front, di, dj, tmp)
+            else:
+                np.logical_and(front, opened[:, k], out=src)
+                new |= _shifted(src, di, dj, tmp)
+        new &= tree
+        new &= ~reached
+        hit |= new[:, n - 1, n - 1]
+        reached |= new
+        front, new = new, front
+    return hit
+
+
+def coupled_realizations(n, densities, neighbors, p_fire, start_cell, rngs):
+    """
+    Une réalisation par générateur de rngs, évaluée à toutes les densités
+    (triées par ordre croissant). Renvoie (valid, percolates) : masques
+    booléens (R, D) (départ sur un arbre / coin atteint).
+
+    Les tirages étant communs, le coin atteint à la densité d l'est aussi
+    à toute densité plus grande : la densité seuil de chaque réalisation est
+    trouvée par dichotomie, toutes les réalisations avançant ensemble
+    (O(log D) propagations vectorisées sur la pile au lieu de D).
+    """
+    offsets = NEIGHBOR_OFFSETS[neighbors]
+    i0, j0 = start_cell
+
+    # tirages propres à chaque réalisation : indépendants du découpage en paquets
+    u = np.empty((len(rngs), n, n))
+    opened = np.empty((len(rngs), len(offsets), n, n), dtype=bool) if p_fire < 1.0 else None
+    for r, rng in enumerate(rngs):
+        u[r] = rng.random((n, n))
+        if opened is not None:
+            opened[r] = rng.random((len(offsets), n, n)) < p_fire
+
+    dens = np.asarray(densities, dtype=float)
+    valid = u[:, i0, j0, None] < dens
+
+    # [lo, hi) : densités où le seuil peut encore se trouver (hi = D : jamais)
+    lo = np.where(valid.any(axis=1), valid.argmax(axis=1), dens.size)
+    hi = np.full(len(rngs), dens.size)
+    while (lo < hi).any():
+        active = lo < hi
+        mid = np.minimum((lo + hi) // 2, dens.size - 1)
+        tree = u < np.where(active, dens[mid], -1.0)[:, None, None]
+        ok = _reaches_corner(tree, opened, offsets, start_cell)
+        hi = np.where(active & ok, mid, hi)
+        lo = np.where(active & ~ok, mid + 1, lo)
+
+    percolates = np.arange(dens.size) >= lo[:, None]
+    return valid, percolates
+
+
+def _coupled_counts(args):
+    """Compte (valides, succès) par densité sur une tranche de réalisations (picklable)."""
+    n, densities, neighbors, p_fire, start_cell, seeds = args
+    valid = np.zeros(len(densities), dtype=np.int64)
+    success = np.zeros(len(densities), dtype=np.int64)
+    # une pile par paquet ; les arêtes ouvertes comptent pour K grilles de plus
+    size = default_batch(n, len(seeds)) // (1 + (len(NEIGHBOR_OFFSETS[neighbors]) if p_fire < 1.0 else 0))
+    size = max(1, size)
+    for a in range(0, len(seeds), size):
+        rngs = [np.random.default_rng(ss) for ss in seeds[a:a + size]]
+        v, s = coupled_realizations(n, densities, neighbors, p_fire, start_cell, rngs)
+        valid += v.sum(axis=0)
+        success += s.sum(axis=0)
+    return valid, success
+
+
+def theta_curve_coupled(n, densities, neighbors, p_fire, start_cell, trials=200, seed=None,
+                        workers=None, progress=None):
+    """
+    θ(d) couplé : trials réalisations, chacune évaluée à toutes les densités.
+    θ(d) est conditionné au départ sur un arbre (comme theta_curve).
+    workers > 1 : les tranches de réalisations sont réparties sur un pool de processus
+    (comptes entiers : résultat identique quel que soit workers).
+    progress(curve) : appelé avec la courbe partielle après chaque tranche de réalisations.
+    """
+    order = np.argsort(densities, kind="stable")
+    ordered = [float(densities[k]) for k in order]
+    seeds = np.random.SeedSequence(seed).spawn(trials)
+    size = max(1, -(-trials // (4 * workers)) if workers is not None and workers > 1 else -(-trials // 10))
+    tasks = [(n, ordered, neighbors, p_fire, start_cell, seeds[a:a + size])
+             for a in range(0, trials, size)]
+
+    valid = np.zeros(len(ordered), dtype=np.int64)
+    success = np.zeros(len(ordered), dtype=np.int64)
+
+    def curve():
+        theta = np.zeros(len(ordered))
+        theta[order] = np.divide(success, valid, out=np.zeros(len(ordered)), where=valid > 0)
+        return [(d, float(t)) for d, t in zip(densities, theta)]
+
+    ex = ProcessPoolExecutor(max_workers=workers) if workers is not None and workers > 1 else None
+    try:
+        results = ex.map(_coupled_counts, tasks) if ex is not None else map(_coupled_counts, tasks)
+        for v, s in results:
+            valid += v
+            success += s
+            if progress is not None:
+                progress(curve())
+    finally:
+        if ex is not None:
+            ex.shutdown(cancel_futures=True)
+
+    return curve()
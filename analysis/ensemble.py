@@ -0,0 +1,147 @@
+import numpy as np
+from model import instrumentation
+from model.forest import Forest, burning_neighbor_count, frontier_mask, grid_metrics, ignition_draws
+
+
+# Métriques d'un essai (dans l'ordre des colonnes de résultats)
+METRICS = ("percolates", "burned_count", "burned_fraction", "time", "frontier")
+
+
+class ForestEnsemble:
+    """
+    B forêts indépendantes simulées ensemble dans un tableau (B, n, n).
+
+    Même automate que Forest (mêmes états, mêmes règles) : chaque pas fait
+    avancer toutes les répliques encore en feu d'un coup ; les répliques
+    éteintes sont écartées des calculs.
+    """
+
+    EMPTY = Forest.EMPTY
+    TREE = Forest.TREE
+    FIRE = Forest.FIRE
+    BURNED = Forest.BURNED
+
+    def __init__(self, size, n, density, neighbors=4, p_fire=1.0, rng=None):
+        self.size = int(size)
+        self.n = int(n)
+        self.density = float(density)
+        self.neighbors = int(neighbors)
+        self.p_fire = float(p_fire)
+
+        self.rng = rng if rng is not None else np.random.default_rng()
+
+        shape = (self.size, self.n, self.n)
+        self.grid = (self.rng.random(shape) < self.density).astype(np.int8) * self.TREE
+
+        self.alive = np.zeros(self.size, dtype=bool)
+        self.time = np.zeros(self.size, dtype=np.int64)
+
+    def ignite_at(self, i, j):
+        """
+        Allume (i,j) dans chaque réplique où c'est un arbre.
+        Renvoie le masque (B,) des répliques allumées (essais valides).
+        """
+        valid = self.grid[:, i, j] == self.TREE
+        self.grid[valid, i, j] = self.FIRE
+        self.alive = valid.copy()
+        return valid
+
+    def step(self):
+        """Un pas pour toutes les répliques vivantes. False si plus aucun feu."""
+        idx = np.flatnonzero(self.alive)
+        if idx.size == 0:
+            return False
+
+        # sous-pile des répliques vivantes (évite de traiter les répliques éteintes)
+        whole = idx.size == self.size
+        g = self.grid if whole else self.grid[idx]
+
+        fire = (g == self.FIRE)
+        count = burning_neighbor_count(fire, self.neighbors)
+        candidates = (g == self.TREE) & (count > 0)
+        ignite = ignition_draws(count, candidates, self.p_fire, self.rng)
+
+        g[fire] = self.BURNED
+        g[ignite] = self.FIRE
+        if not whole:
+            self.grid[idx] = g
+
+        self.time[idx] += 1
+        self.alive[idx] = ignite.any(axis=(1, 2))
+        return True
+
+    def run(self):
+        """Fait évoluer toutes les répliques jusqu'à extinction."""
+        while self.step():
+            pass
+
+    # ---------- métriques (tableaux de taille B) ----------
+    def percolates(self):
+        corner = self.grid[:, self.n - 1, self.n - 1]
+        return (corner == self.FIRE) | (corner == self.BURNED)
+
+    def burned_count(self):
+        return np.count_nonzero(self.grid == self.BURNED, axis=(1, 2))
+
+    def burned_fraction(self):
+        return self.burned_count() / float(self.n * self.n)
+
+    def time_to_extinction(self):
+        return self.time.copy()
+
+    def burned_frontier_count(self):
+        """Cellules brûlées ayant au moins un arbre intact parmi leurs 4 voisins."""
+        return np.count_nonzero(frontier_mask(self.grid == self.BURNED, self.grid == self.TREE), axis=(1, 2))
+
+    def metrics(self, keys=METRICS):
+        """Métriques demandées (tableaux de taille B) en une seule passe."""
+        m = grid_metrics(self.grid, keys)
+        if "time" in keys:
+            m["time"] = self.time_to_extinction()
+        return m
+
+
+def default_batch(n, trials):
+    """Taille de paquet par défaut : ~16 M cellules par paquet au plus."""
+    return max(1, min(trials, (1 << 24) // max(1, n * n)))
+
+
+def run_ensemble_trials(n, density, neighbors, p_fire, start_cell, trials, rng, batch=None,
+                        metrics=METRICS):
+    """
+    Équivalent vectorisé de `trials` appels à run_one_trial.
+    Les essais sont simulés par paquets de `batch` répliques.
+    Renvoie un dict de tableaux (un élément par essai valide), limité à `metrics`.
+    Si seule la percolation est demandée, une réplique est arrêtée dès que
+    son coin s'enflamme ou s'il est vide.
+    """
+    if batch is None:
+        batch = default_batch(n, trials)
+
+    i0, j0 = start_cell
+    parts = {k: [] for k in metrics}
+    corner_only = set(metrics) <= {"percolates"}
+
+    remaining = trials
+    while remaining > 0:
+        size = min(batch, remaining)
+        remaining -= size
+
+        with instrumentation.phase("terrain"):
+            ens = ForestEnsemble(size, n, density, neighbors=neighbors, p_fire=p_fire, rng=rng)
+        valid = ens.ignite_at(i0, j0)
+        with instrumentation.phase("ensemble_run"):
+            if corner_only:
+                corner = ens.grid[:, n - 1, n - 1]
+                ens.alive &= corner == ens.TREE
+                while ens.step():
+                    ens.alive &= corner == ens.TREE
+            else:
+                ens.run()
+        with instrumentation.phase("metrics"):
+            m = ens.metrics(metrics)
+
+        for k in parts:
+            parts[k].append(m[k][valid])
+
+    return {k: np.concatenate(v) for k, v in parts.items()}
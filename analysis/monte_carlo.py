@@ -1,75 +1,444 @@
+from concurrent.futures import ProcessPoolExecutor
+
 import numpy as np
+from model import instrumentation
 from model.forest import Forest
+from analysis.ensemble import METRICS, run_ensemble_trials, default_batch
+from analysis.stats import QUANTILES, TrialAccumulator
+from analysis.coupled import theta_curve_coupled
+
+
+METRIC_DTYPES = {
+    "percolates": bool,
+    "burned_count": np.int64,
+    "burned_fraction": float,
+    "time": np.int64,
+    "frontier": np.int64,
+}
+
+
+def _check_metrics(metrics):
+    unknown = set(metrics) - set(METRICS)
+    if unknown or not metrics:
+        raise ValueError(f"métriques inconnues : {sorted(unknown)} (attendu : {', '.join(METRICS)})")
+    return tuple(k for k in METRICS if k in metrics)
 
 
-def run_one_trial(n, density, neighbors, p_fire, start_cell, rng):
+def run_one_trial(n, density, neighbors, p_fire, start_cell, rng, metrics=METRICS):
+    """
+    Un essai : dict des métriques demandées, ou None si le départ n'est pas un arbre.
+    Si seule la percolation est demandée, la propagation s'arrête dès que le
+    coin s'enflamme (ou tout de suite si le coin est vide).
+    """
+    with instrumentation.phase("trial"):
+        return _one_trial(n, density, neighbors, p_fire, start_cell, rng, metrics)
+
+
+def _one_trial(n, density, neighbors, p_fire, start_cell, rng, metrics):
     forest = Forest(n, density, neighbors=neighbors, p_fire=p_fire, rng=rng)
+    corner_only = set(metrics) <= {"percolates"}
+    corner = (n - 1, n - 1)
 
     i0, j0 = start_cell
-    if not forest.ignite_at(i0, j0):
-        # départ sur une case vide → on considère l’essai invalide
-        return None
+    if p_fire >= 1.0:
+        # propagation déterministe : parcours de l'amas en une passe
+        if not forest.burn_cluster(i0, j0, target=corner if corner_only else None):
+            return None
+    else:
+        if not forest.ignite_at(i0, j0):
+            # départ sur une case vide → on considère l’essai invalide
+            return None
 
-    while forest.step():
-        pass
+        if corner_only:
+            while forest.grid[corner] == forest.TREE and forest.step():
+                pass
+        else:
+            while forest.step():
+                pass
 
-    return {
-        "percolates": forest.percolates(),
-        "burned_count": forest.burned_count(),
-        "burned_fraction": forest.burned_fraction(),
-        "time": forest.time_to_extinction(),
-        "frontier": forest.burned_frontier_count(),
-    }
+    m = forest.metrics(metrics)
+    m["time"] = forest.time_to_extinction()
+    return {k: m[k] for k in metrics}
 
 
-def monte_carlo(n, density, neighbors, p_fire, start_cell, trials=200, seed=None):
+def trial_seeds(seed, trials):
     """
-    Lance trials simulations indépendantes et renvoie :
-    - probabilité de percolation
-    - moyennes / variances des métriques
-    Reproductible si seed est fixé.
+    Un flux aléatoire indépendant par essai (SeedSequence.spawn) :
+    le résultat de l'essai k ne dépend que de (seed, k), pas de l'ordre
+    d'exécution ni du nombre de processus.
+    seed peut aussi être une SeedSequence : des appels successifs donnent
+    alors les essais suivants (k, k+1, ...).
     """
-    rng = np.random.default_rng(seed)
+    if not isinstance(seed, np.random.SeedSequence):
+        seed = np.random.SeedSequence(seed)
+    return seed.spawn(trials)
+
+
+def wilson_interval(successes, trials, z=1.96):
+    """Intervalle de confiance de Wilson pour une proportion (z = 1.96 : 95 %)."""
+    if trials == 0:
+        return 0.0, 1.0
+    p = successes / trials
+    z2 = z * z
+    center = (p + z2 / (2 * trials)) / (1 + z2 / trials)
+    half = z * np.sqrt(p * (1 - p) / trials + z2 / (4 * trials * trials)) / (1 + z2 / trials)
+    return float(max(0.0, center - half)), float(min(1.0, center + half))
+
+
+def _work_units(trials, engine, batch, n, workers):
+    """Découpe [0, trials) en tranches contiguës (start, stop)."""
+    if engine == "ensemble":
+        # tranches = paquets de l'ensemble : indépendantes du nombre de processus ;
+        # au moins ~10 paquets par défaut, pour que progress (et l'annulation)
+        # intervienne en cours de calcul
+        size = batch if batch is not None else min(default_batch(n, trials), -(-trials // 10))
+    elif workers > 1:
+        size = -(-trials // (4 * workers))
+    else:
+        # tranches de la taille d'un paquet : points d'avancement réguliers (progress)
+        size = default_batch(n, trials)
+    size = max(1, size)
+    return [(a, min(a + size, trials)) for a in range(0, trials, size)]
+
+
+def _run_unit(args):
+    """Exécute une tranche d'essais (fonction de niveau module : picklable)."""
+    n, density, neighbors, p_fire, start_cell, seeds, engine, metrics = args
+    if engine == "ensemble":
+        # un paquet = une réplique empilée par essai, flux du premier essai du paquet
+        rng = np.random.default_rng(seeds[0])
+        return run_ensemble_trials(n, density, neighbors, p_fire, start_cell, len(seeds), rng,
+                                   batch=len(seeds), metrics=metrics)
 
     results = []
-    for _ in range(trials):
-        r = run_one_trial(n, density, neighbors, p_fire, start_cell, rng)
+    for ss in seeds:
+        r = run_one_trial(n, density, neighbors, p_fire, start_cell, np.random.default_rng(ss),
+                          metrics=metrics)
         if r is not None:
             results.append(r)
 
-    if len(results) == 0:
+    return {k: np.array([r[k] for r in results], dtype=METRIC_DTYPES[k]) for k in metrics}
+
+
+def _run_unit_recorded(args):
+    """_run_unit dans un processus du pool, avec ses mesures d'instrumentation."""
+    events = args[-1]
+    with instrumentation.recording(events=events) as rec:
+        res = _run_unit(args[:-1])
+    return res, rec.state()
+
+
+def _imap_units(tasks, workers):
+    """Exécute les tâches (en série ou sur un pool de processus) ; résultats dans l'ordre, au fil de l'eau."""
+    if workers is not None and workers > 1 and len(tasks) > 1:
+        ex = ProcessPoolExecutor(max_workers=workers)
+        rec = instrumentation.active()
+        try:
+            if rec is None:
+                yield from ex.map(_run_unit, tasks)
+            else:
+                # les mesures des processus sont rapatriées dans l'enregistrement courant
+                for res, state in ex.map(_run_unit_recorded, [t + (rec.keep_events,) for t in tasks]):
+                    rec.merge(state)
+                    yield res
+        finally:
+            ex.shutdown(cancel_futures=True)
+    else:
+        for t in tasks:
+            yield _run_unit(t)
+
+
+def _map_units(tasks, workers):
+    return list(_imap_units(tasks, workers))
+
+
+def _merge(parts):
+    return {k: np.concatenate([p[k] for p in parts]) for k in parts[0]}
+
+
+def _trial_tasks(n, density, neighbors, p_fire, start_cell, trials, seed, engine, batch, workers,
+                 metrics=METRICS):
+    if engine not in ("forest", "ensemble"):
+        raise ValueError(f"engine inconnu : {engine!r} (attendu : forest, ensemble)")
+    metrics = _check_metrics(metrics)
+    if p_fire >= 1.0:
+        # propagation déterministe : un parcours de l'amas par essai (burn_cluster)
+        # est bien plus rapide que le pas à pas de l'ensemble
+        engine = "forest"
+    seeds = trial_seeds(seed, trials)
+    return [
+        (n, density, neighbors, p_fire, start_cell, seeds[a:b], engine, metrics)
+        for a, b in _work_units(trials, engine, batch, n, workers or 1)
+    ]
+
+
+def run_trials(n, density, neighbors, p_fire, start_cell, trials, seed=None,
+               engine="forest", batch=None, workers=None, metrics=METRICS):
+    """
+    Lance trials simulations et renvoie les métriques des essais valides
+    sous forme de dict de tableaux (dans l'ordre des essais).
+    engine : "forest" (une Forest par essai) ou "ensemble" (répliques empilées) ;
+    à p_fire = 1, les essais passent toujours par burn_cluster (engine ignoré).
+    workers > 1 : répartit les essais sur un pool de processus.
+    metrics : métriques à calculer (sous-ensemble de METRICS) ; ("percolates",)
+    arrête chaque essai dès que son issue est connue.
+    """
+    tasks = _trial_tasks(n, density, neighbors, p_fire, start_cell, trials, seed, engine, batch, workers,
+                         metrics)
+    return _merge(_map_units(tasks, workers))
+
+
+def _reported(parts, tasks, progress):
+    """Relaie les résultats des tranches en appelant progress(essais lancés) après chacune."""
+    done = 0
+    for task, part in zip(tasks, parts):
+        done += len(task[5])
+        progress(done)
+        yield part
+
+
+def _accumulate(parts, block=4096):
+    """
+    Agrège au fil de l'eau les paquets de résultats (mémoire bornée par `block`).
+    Les essais valides sont regroupés par blocs de taille fixe avant d'entrer
+    dans l'accumulateur : le résultat ne dépend pas du découpage en tranches
+    (donc pas du nombre de processus), à l'arrondi près compris.
+    """
+    acc = TrialAccumulator()
+    pending = []
+    size = 0
+    for part in parts:
+        pending.append(part)
+        size += len(next(iter(part.values())))
+        if size >= block:
+            res = _merge(pending)
+            for a in range(0, size - size % block, block):
+                acc.update({k: v[a:a + block] for k, v in res.items()})
+            pending = [{k: v[size - size % block:] for k, v in res.items()}]
+            size %= block
+    if size:
+        acc.update(_merge(pending))
+    return acc
+
+
+def summarize_accumulator(acc):
+    """
+    Statistiques (θ, moyennes, variances, quantiles) d'un TrialAccumulator ;
+    seules les métriques effectivement accumulées apparaissent.
+    """
+    if acc.trials_used == 0:
         return None
 
-    percs = np.array([r["percolates"] for r in results], dtype=float)
-    burned_frac = np.array([r["burned_fraction"] for r in results], dtype=float)
-    times = np.array([r["time"] for r in results], dtype=float)
-    frontiers = np.array([r["frontier"] for r in results], dtype=float)
-
-    return {
-        "trials_used": len(results),
-        "theta": float(percs.mean()),
-        "theta_var": float(percs.var()),
-        "burned_mean": float(burned_frac.mean()),
-        "burned_var": float(burned_frac.var()),
-        "time_mean": float(times.mean()),
-        "time_var": float(times.var()),
-        "frontier_mean": float(frontiers.mean()),
-        "frontier_var": float(frontiers.var()),
+    stats = {
+        "trials_used": acc.trials_used,
+        "trials_run": acc.trials_run,
     }
+    if acc.percolation:
+        theta = acc.successes / acc.trials_used
+        lo, hi = wilson_interval(acc.successes, acc.trials_used)
+        stats["theta"] = theta
+        stats["theta_var"] = theta * (1.0 - theta)
+        stats["theta_ci_low"] = lo
+        stats["theta_ci_high"] = hi
+    if acc.burned.count:
+        stats["burned_mean"] = acc.burned.mean
+        stats["burned_var"] = acc.burned.variance
+    if acc.time.count:
+        stats["time_mean"] = acc.time.mean
+        stats["time_var"] = acc.time.variance
+    if acc.frontier.count:
+        stats["frontier_mean"] = acc.frontier.mean
+        stats["frontier_var"] = acc.frontier.variance
+    for q in QUANTILES:
+        if acc.burned.count:
+            stats[f"burned_q{round(q * 100):02d}"] = acc.burned_hist.quantile(q)
+        if acc.time.count:
+            stats[f"time_q{round(q * 100):02d}"] = acc.time_hist.quantile(q)
+    return stats
+
+
+def summarize(res, trials_run=None):
+    """Statistiques à partir des tableaux de run_trials (voir summarize_accumulator)."""
+    return summarize_accumulator(TrialAccumulator().update(res, trials_run))
+
+
+def monte_carlo(n, density, neighbors, p_fire, start_cell, trials=200, seed=None,
+                engine="forest", batch=None, workers=None,
+                target_halfwidth=None, max_trials=None, metrics=METRICS, profile=False, progress=None):
+    """
+    Lance trials simulations indépendantes et renvoie :
+    - probabilité de percolation (+ intervalle de Wilson à 95 %)
+    - moyennes / variances des métriques, quantiles 5 / 50 / 95 %
+      de la fraction brûlée et du temps (burned_q05, ..., time_q95)
+    Reproductible si seed est fixé, quel que soit workers
+    (un flux SeedSequence par essai).
+    engine="ensemble" simule les essais par paquets dans un seul tableau (B, n, n).
+
+    Mode séquentiel (target_halfwidth) : les essais sont lancés par paquets
+    de `trials` jusqu'à ce que la demi-largeur de l'intervalle de Wilson sur θ
+    soit ≤ target_halfwidth, ou que max_trials essais (défaut : 10 × trials)
+    aient été lancés. trials_run donne le nombre d'essais lancés.
 
+    metrics : métriques à calculer (voir run_trials) ; les statistiques
+    des métriques non demandées sont absentes du résultat.
+    profile=True : ajoute stats["profile"], coût par phase
+    (model/instrumentation.py, Recorder.breakdown).
+    progress(trials_run) : appelé après chaque tranche d'essais (un paquet) ;
+    une exception qu'il lève interrompt le calcul (annulation).
+    """
+    if profile:
+        with instrumentation.recording(events=False, this_thread=True) as rec:
+            with instrumentation.phase("monte_carlo"):
+                stats = monte_carlo(n, density, neighbors, p_fire, start_cell, trials, seed, engine, batch,
+                                    workers, target_halfwidth, max_trials, metrics, progress=progress)
+        if stats is not None:
+            stats["profile"] = rec.breakdown()
+        return stats
+
+    if target_halfwidth is None:
+        tasks = _trial_tasks(n, density, neighbors, p_fire, start_cell, trials, seed, engine, batch, workers,
+                             metrics)
+        parts = _imap_units(tasks, workers)
+        if progress is not None:
+            parts = _reported(parts, tasks, progress)
+        acc = _accumulate(parts)
+        acc.trials_run = trials
+        return summarize_accumulator(acc)
+
+    if "percolates" not in metrics:
+        raise ValueError("target_halfwidth porte sur θ : metrics doit contenir \"percolates\"")
+    if max_trials is None:
+        max_trials = 10 * trials
+    root = np.random.SeedSequence(seed)
+
+    acc = TrialAccumulator()
+    while acc.trials_run < max_trials:
+        size = min(trials, max_trials - acc.trials_run)
+        acc.update(run_trials(n, density, neighbors, p_fire, start_cell, size, root,
+                              engine=engine, batch=batch, workers=workers, metrics=metrics),
+                   trials_run=size)
+        if progress is not None:
+            progress(acc.trials_run)
+
+        lo, hi = wilson_interval(acc.successes, acc.trials_used)
+        if acc.trials_used > 0 and (hi - lo) / 2 <= target_halfwidth:
+            break
 
-def theta_curve(n, densities, neighbors, p_fire, start_cell, trials=200, seed=None):
+    return summarize_accumulator(acc)
+
+
+def theta_curve(n, densities, neighbors, p_fire, start_cell, trials=200, seed=None,
+                engine="forest", batch=None, workers=None, progress=None, coupled=False):
     """
     Calcule θ(d) pour une liste de densités.
+    workers > 1 : toutes les tranches d'essais de toutes les densités
+    sont réparties ensemble sur le pool de processus.
+    progress(curve) : appelé avec la courbe partielle après chaque densité.
+    coupled=True : nombres aléatoires communs à toutes les densités
+    (voir analysis/coupled.py) ; engine et batch sont alors ignorés.
     """
+    if coupled:
+        return theta_curve_coupled(n, densities, neighbors, p_fire, start_cell, trials, seed,
+                                   workers=workers, progress=progress)
+
+    per_density = [
+        _trial_tasks(n, d, neighbors, p_fire, start_cell, trials, seed, engine, batch, workers,
+                     metrics=("percolates",))
+        for d in densities
+    ]
+    flat = [t for tasks in per_density for t in tasks]
+    parts = _imap_units(flat, workers)
+
     curve = []
-    for d in densities:
-        stats = monte_carlo(
-            n=n, density=d, neighbors=neighbors, p_fire=p_fire,
-            start_cell=start_cell, trials=trials, seed=seed
-        )
+    for d, tasks in zip(densities, per_density):
+        stats = summarize(_merge([next(parts) for _ in tasks]))
         if stats is None:
             curve.append((d, 0.0))
         else:
             curve.append((d, stats["theta"]))
+        if progress is not None:
+            progress(list(curve))
     return curve
+
+
+def critical_density(curve, level=0.5):
+    """
+    Estimation de la densité critique : première traversée de θ = level
+    (interpolation linéaire) ; à défaut, milieu de l'intervalle le plus raide.
+    """
+    pts = sorted(curve)
+    for (d0, t0), (d1, t1) in zip(pts, pts[1:]):
+        if t0 < level <= t1:
+            return d0 + (level - t0) * (d1 - d0) / (t1 - t0)
+    if len(pts) < 2:
+        return None
+    k = max(range(len(pts) - 1), key=lambda i: (pts[i + 1][1] - pts[i][1]) / (pts[i + 1][0] - pts[i][0]))
+    return (pts[k][0] + pts[k + 1][0]) / 2
+
+
+def adaptive_theta_curve(n, neighbors, p_fire, start_cell, budget, d_min=0.1, d_max=0.95,
+                         coarse=6, batch=None, min_step=0.005, seed=None,
+                         engine="forest", workers=None, progress=None):
+    """
+    θ(d) raffiné là où il est utile, pour un budget total de `budget` essais.
+
+    Part d'une grille grossière (coarse densités), puis, paquet par paquet
+    (batch essais, défaut budget / (4 × coarse)) :
+    - insère le milieu de l'intervalle où θ saute le plus (transition),
+    - ou complète le point dont l'intervalle de Wilson est le plus large,
+    selon la plus grande des deux quantités (toutes deux en unités de θ).
+    Chaque densité garde son flux d'essais (même seed que theta_curve).
+    progress(curve) : appelé avec la courbe courante après chaque paquet.
+
+    Renvoie (curve, d_c) : liste triée de (d, θ) et densité critique estimée.
+    """
+    if batch is None:
+        batch = max(10, budget // (4 * coarse))
+
+    # d -> [SeedSequence, succès, valides]
+    points = {}
+    spent = 0
+
+    def sample(d):
+        nonlocal spent
+        size = min(batch, budget - spent)
+        if size <= 0:
+            return
+        if d not in points:
+            points[d] = [np.random.SeedSequence(seed), 0, 0]
+        res = run_trials(n, d, neighbors, p_fire, start_cell, size, points[d][0],
+                         engine=engine, workers=workers, metrics=("percolates",))
+        points[d][1] += int(np.count_nonzero(res["percolates"]))
+        points[d][2] += len(res["percolates"])
+        spent += size
+        if progress is not None:
+            progress([(x, theta(x)) for x in sorted(points)])
+
+    def theta(d):
+        _, s, v = points[d]
+        return s / v if v else 0.0
+
+    for d in np.linspace(d_min, d_max, coarse):
+        sample(round(float(d), 4))
+
+    while spent < budget:
+        ds = sorted(points)
+
+        jumps = [
+            (abs(theta(b) - theta(a)), (a + b) / 2)
+            for a, b in zip(ds, ds[1:]) if b - a > 2 * min_step
+        ]
+        widths = []
+        for d in ds:
+            lo, hi = wilson_interval(points[d][1], points[d][2])
+            widths.append(((hi - lo) / 2, d))
+
+        best_jump = max(jumps) if jumps else (-1.0, None)
+        best_width = max(widths)
+        if best_jump[0] >= best_width[0]:
+            sample(round(best_jump[1], 4))
+        else:
+            sample(best_width[1])
+
+    curve = [(d, theta(d)) for d in sorted(points)]
+    return curve, critical_density(curve)
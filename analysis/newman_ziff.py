@@ -0,0 +1,122 @@
+import numpy as np
+from model.forest import NEIGHBOR_OFFSETS
+
+
+def _neighbor_lists(n, neighbors):
+    """Liste (Python) des voisins de chaque site, en indices plats."""
+    out = []
+    for i in range(n):
+        for j in range(n):
+            nb = []
+            for di, dj in NEIGHBOR_OFFSETS[neighbors]:
+                ni, nj = i + di, j + dj
+                if 0 <= ni < n and 0 <= nj < n:
+                    nb.append(ni * n + nj)
+            out.append(nb)
+    return out
+
+
+def connection_count(n, neighbors, start_cell, rng, nbrs=None):
+    """
+    Une réalisation Newman–Ziff : on ajoute les arbres un par un dans un ordre
+    aléatoire en fusionnant les amas (union-find), et on renvoie le nombre
+    d'arbres k* à partir duquel le départ est relié au coin bas-droit.
+    (La connexion, une fois établie, le reste pour tout k ≥ k*.)
+    """
+    if nbrs is None:
+        nbrs = _neighbor_lists(n, neighbors)
+
+    N = n * n
+    s = start_cell[0] * n + start_cell[1]
+    t = N - 1
+
+    parent = list(range(N))
+    size = [1] * N
+    occupied = bytearray(N)
+
+    def find(a):
+        while parent[a] != a:
+            parent[a] = parent[parent[a]]
+            a = parent[a]
+        return a
+
+    for k, site in enumerate(rng.permutation(N).tolist(), 1):
+        occupied[site] = 1
+        r = site
+        for nb in nbrs[site]:
+            if not occupied[nb]:
+                continue
+            rb = find(nb)
+            if rb == r:
+                continue
+            # union par taille
+            if size[rb] > size[r]:
+                r, rb = rb, r
+            parent[rb] = r
+            size[r] += size[rb]
+
+        if occupied[s] and occupied[t] and find(s) == find(t):
+            return k
+
+    return N
+
+
+def binomial_weights(N, densities, width=12.0):
+    """
+    B(N, k, d) pour chaque densité, restreint à la fenêtre utile
+    k ∈ N·d ± width·√(N·d(1−d)) (au-delà, les poids sont < 1e-30) :
+    liste de (k0, poids) avec poids[i] = B(N, k0 + i, d). Calcul en log ;
+    mémoire O(N + D·√N) au lieu d'une matrice dense (D, N+1).
+    """
+    k = np.arange(1, N + 1)
+    log_comb = np.concatenate(([0.0], np.cumsum(np.log((N - k + 1) / k))))
+    out = []
+    for d in np.clip(np.asarray(densities, dtype=float), 1e-12, 1 - 1e-12):
+        half = width * np.sqrt(N * d * (1.0 - d)) + width
+        k0 = max(0, int(np.floor(N * d - half)))
+        k1 = min(N, int(np.ceil(N * d + half)))
+        kk = np.arange(k0, k1 + 1)
+        out.append((k0, np.exp(log_comb[k0:k1 + 1] + kk * np.log(d) + (N - kk) * np.log1p(-d))))
+    return out
+
+
+def theta_curve_newman_ziff(n, neighbors, start_cell, realizations=200, seed=None, densities=None,
+                            progress=None):
+    """
+    θ(d) pour la percolation de site (p_fire = 1) par la méthode de Newman–Ziff.
+
+    Chaque réalisation donne, pour tout nombre d'arbres k, l'indicatrice
+    « départ relié au coin » ; la moyenne C_k sur les réalisations est
+    convertie en courbe continue par convolution binomiale :
+        θ(d) = Σ_k B(N, k, d) C_k / d
+    (division par d = P(départ est un arbre), comme monte_carlo qui ignore
+    les essais dont le départ est vide).
+
+    Renvoie une liste de (d, θ) directement traçable, sur `densities`
+    (par défaut 0.1 → 0.95 au pas de 0.005).
+    progress(curve) : appelé avec la courbe partielle (réalisations déjà faites)
+    environ tous les 5 % des réalisations.
+    """
+    if densities is None:
+        densities = np.round(np.linspace(0.1, 0.95, 171), 3)
+    densities = np.asarray(densities, dtype=float)
+
+    rng = np.random.default_rng(seed)
+    N = n * n
+    nbrs = _neighbor_lists(n, neighbors)
+
+    weights = [(k0, w / max(d, 1e-12)) for (k0, w), d in zip(binomial_weights(N, densities), densities)]
+
+    def curve(hits, done):
+        c = np.cumsum(hits) / done
+        theta = [min(1.0, max(0.0, float(w @ c[k0:k0 + w.size]))) for k0, w in weights]
+        return [(float(d), p) for d, p in zip(densities, theta)]
+
+    every = max(1, realizations // 20)
+    hits = np.zeros(N + 1)
+    for r in range(1, realizations + 1):
+        hits[connection_count(n, neighbors, start_cell, rng, nbrs=nbrs)] += 1
+        if progress is not None and r % every == 0 and r < realizations:
+            progress(curve(hits, r))
+
+    return curve(hits, realizations)
@@ -0,0 +1,235 @@
+"""
+Accumulateurs statistiques en ligne, en mémoire constante et fusionnables.
+
+Chaque accumulateur se met à jour essai par essai (ou par tableau d'essais)
+et se combine avec un autre (merge) : des paquets calculés par des processus
+ou des machines différents donnent les mêmes statistiques que si tous les
+essais avaient été vus par un seul accumulateur. to_dict / from_dict
+permettent de sauvegarder un accumulateur (JSON) pour le fusionner plus tard.
+"""
+import numpy as np
+
+
+QUANTILES = (0.05, 0.5, 0.95)
+
+
+class RunningStats:
+    """Moyenne et variance (population, comme np.var) par l'algorithme de Welford / Chan."""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def push(self, x):
+        """Ajoute une valeur."""
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (x - self.mean)
+
+    def update(self, values):
+        """Ajoute un tableau de valeurs (combiné comme un paquet)."""
+        values = np.asarray(values, dtype=float)
+        if values.size == 0:
+            return self
+        other = RunningStats()
+        other.count = int(values.size)
+        other.mean = float(values.mean())
+        other.m2 = float(((values - other.mean) ** 2).sum())
+        return self.merge(other)
+
+    def merge(self, other):
+        """Fusionne other dans self (formule de Chan et al.)."""
+        if other.count == 0:
+            return self
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / total
+        self.m2 += other.m2 + delta * delta * self.count * other.count / total
+        self.count = total
+        return self
+
+    @property
+    def variance(self):
+        return self.m2 / self.count if self.count else 0.0
+
+    def to_dict(self):
+        return {"count": self.count, "mean": self.mean, "m2": self.m2}
+
+    @classmethod
+    def from_dict(cls, d):
+        s = cls()
+        s.count, s.mean, s.m2 = int(d["count"]), float(d["mean"]), float(d["m2"])
+        return s
+
+
+class Histogram:
+    """
+    Histogramme à classes fixes sur [lo, hi] (valeurs hors bornes ramenées
+    dans la première / dernière classe). Deux histogrammes de mêmes classes
+    se fusionnent en sommant les effectifs.
+    """
+
+    def __init__(self, lo=0.0, hi=1.0, bins=1000):
+        self.lo = float(lo)
+        self.hi = float(hi)
+        self.counts = np.zeros(int(bins), dtype=np.int64)
+
+    def update(self, values):
+        values = np.asarray(values, dtype=float)
+        if values.size:
+            k = ((values - self.lo) * (self.counts.size / (self.hi - self.lo))).astype(np.int64)
+            np.clip(k, 0, self.counts.size - 1, out=k)
+            self.counts += np.bincount(k, minlength=self.counts.size)
+        return self
+
+    def merge(self, other):
+        if (other.lo, other.hi, other.counts.size) != (self.lo, self.hi, self.counts.size):
+            raise ValueError("histogrammes de classes différentes")
+        self.counts += other.counts
+        return self
+
+    def quantile(self, q):
+        """Quantile q, interpolé linéairement dans la classe qui le contient."""
+        total = int(self.counts.sum())
+        if total == 0:
+            return float("nan")
+        cum = np.cumsum(self.counts)
+        target = q * total
+        k = min(int(np.searchsorted(cum, target)), self.counts.size - 1)
+        before = cum[k - 1] if k > 0 else 0
+        frac = (target - before) / self.counts[k] if self.counts[k] else 0.0
+        width = (self.hi - self.lo) / self.counts.size
+        return float(self.lo + (k + frac) * width)
+
+    def to_dict(self):
+        return {"lo": self.lo, "hi": self.hi, "counts": self.counts.tolist()}
+
+    @classmethod
+    def from_dict(cls, d):
+        h = cls(d["lo"], d["hi"], len(d["counts"]))
+        h.counts[:] = d["counts"]
+        return h
+
+
+class IntHistogram:
+    """
+    Histogramme exact de valeurs entières ≥ 0 (une classe par valeur, agrandi
+    à la demande) : adapté aux durées, bornées mais d'échelle inconnue à l'avance.
+    """
+
+    def __init__(self):
+        self.counts = np.zeros(0, dtype=np.int64)
+
+    def _grow(self, size):
+        if size > self.counts.size:
+            self.counts = np.concatenate((self.counts, np.zeros(size - self.counts.size, dtype=np.int64)))
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.int64)
+        if values.size:
+            c = np.bincount(values)
+            self._grow(c.size)
+            self.counts[:c.size] += c
+        return self
+
+    def merge(self, other):
+        self._grow(other.counts.size)
+        self.counts[:other.counts.size] += other.counts
+        return self
+
+    def quantile(self, q):
+        """Plus petite valeur v telle que P(X ≤ v) ≥ q (inverse de la fonction de répartition)."""
+        total = int(self.counts.sum())
+        if total == 0:
+            return float("nan")
+        cum = np.cumsum(self.counts)
+        return float(np.searchsorted(cum, max(q * total, 1)))
+
+    def to_dict(self):
+        return {"counts": self.counts.tolist()}
+
+    @classmethod
+    def from_dict(cls, d):
+        h = cls()
+        h.counts = np.array(d["counts"], dtype=np.int64)
+        return h
+
+
+class TrialAccumulator:
+    """
+    Agrège les essais Monte-Carlo (dict de tableaux de run_trials) :
+    nombre d'essais lancés / valides, succès de percolation, moyennes et
+    variances des métriques, histogrammes de la fraction brûlée et du temps.
+    Les métriques absentes des résultats (run_trials(metrics=...)) sont ignorées ;
+    percolation indique si la percolation a été accumulée (successes a un sens).
+    """
+
+    def __init__(self):
+        self.trials_run = 0
+        self.trials_used = 0
+        self.percolation = False
+        self.successes = 0
+        self.burned = RunningStats()
+        self.time = RunningStats()
+        self.frontier = RunningStats()
+        self.burned_hist = Histogram(0.0, 1.0, 1000)
+        self.time_hist = IntHistogram()
+
+    def update(self, res, trials_run=None):
+        """Ajoute un paquet de résultats ; trials_run : essais lancés (valides ou non)."""
+        used = len(next(iter(res.values())))
+        self.trials_used += used
+        self.trials_run += used if trials_run is None else int(trials_run)
+        if "percolates" in res:
+            self.percolation = True
+            self.successes += int(np.count_nonzero(res["percolates"]))
+        if "burned_fraction" in res:
+            self.burned.update(res["burned_fraction"])
+            self.burned_hist.update(res["burned_fraction"])
+        if "time" in res:
+            self.time.update(res["time"])
+            self.time_hist.update(res["time"])
+        if "frontier" in res:
+            self.frontier.update(res["frontier"])
+        return self
+
+    def merge(self, other):
+        self.trials_run += other.trials_run
+        self.trials_used += other.trials_used
+        self.percolation |= other.percolation
+        self.successes += other.successes
+        self.burned.merge(other.burned)
+        self.time.merge(other.time)
+        self.frontier.merge(other.frontier)
+        self.burned_hist.merge(other.burned_hist)
+        self.time_hist.merge(other.time_hist)
+        return self
+
+    def to_dict(self):
+        return {
+            "trials_run": self.trials_run,
+            "trials_used": self.trials_used,
+            "percolation": self.percolation,
+            "successes": self.successes,
+            "burned": self.burned.to_dict(),
+            "time": self.time.to_dict(),
+            "frontier": self.frontier.to_dict(),
+            "burned_hist": self.burned_hist.to_dict(),
+            "time_hist": self.time_hist.to_dict(),
+        }
+
+    @classmethod
+    def from_dict(cls, d):
+        acc = cls()
+        acc.trials_run = int(d["trials_run"])
+        acc.trials_used = int(d["trials_used"])
+        acc.percolation = bool(d.get("percolation", True))
+        acc.successes = int(d["successes"])
+        acc.burned = RunningStats.from_dict(d["burned"])
+        acc.time = RunningStats.from_dict(d["time"])
+        acc.frontier = RunningStats.from_dict(d["frontier"])
+        acc.burned_hist = Histogram.from_dict(d["burned_hist"])
+        acc.time_hist = IntHistogram.from_dict(d["time_hist"])
+        return acc
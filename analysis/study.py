@@ -0,0 +1,76 @@
+import queue
+import threading
+
+from analysis.monte_carlo import monte_carlo, critical_density
+
+
+class StudyCancelled(Exception):
+    """Levée dans le thread de l'étude quand l'utilisateur l'annule."""
+
+
+class StudyWorker(threading.Thread):
+    """
+    Étude (stats + courbe θ(d)) exécutée dans un thread d'arrière-plan.
+
+    Reprend l'API Monte-Carlo telle quelle :
+    - stats_kwargs : arguments de monte_carlo (stats à une densité), optionnel,
+    - curve_func / curve_kwargs : theta_curve, adaptive_theta_curve ou
+      theta_curve_newman_ziff et leurs arguments (sans progress).
+
+    Les résultats partiels sont publiés dans la file `events` :
+      ("stats", stats)          stats détaillées
+      ("curve", curve)          courbe partielle après chaque densité / paquet
+      ("done", curve, d_c)      fin de l'étude
+      ("cancelled",)            étude annulée par cancel()
+      ("error", exc)            exception levée pendant l'étude
+
+    cache : ResultCache optionnel placé devant les deux calculs
+    (une étude déjà faite avec le même seed est relue immédiatement).
+    """
+
+    def __init__(self, curve_func, curve_kwargs, stats_kwargs=None, cache=None):
+        super().__init__(daemon=True)
+        self.curve_func = curve_func
+        self.curve_kwargs = curve_kwargs
+        self.stats_kwargs = stats_kwargs
+        self.cache = cache
+        self.events = queue.Queue()
+        self._cancel = threading.Event()
+
+    def cancel(self):
+        """Demande l'arrêt : pris en compte au prochain paquet d'essais ou point de la courbe."""
+        self._cancel.set()
+
+    def _check(self):
+        if self._cancel.is_set():
+            raise StudyCancelled()
+
+    def _stats_progress(self, trials_run):
+        self._check()
+
+    def _progress(self, curve):
+        self._check()
+        self.events.put(("curve", curve))
+
+    def _call(self, func, **kwargs):
+        if self.cache is not None:
+            return self.cache.call(func, **kwargs)
+        return func(**kwargs)
+
+    def run(self):
+        try:
+            if self.stats_kwargs is not None:
+                stats = self._call(monte_carlo, progress=self._stats_progress, **self.stats_kwargs)
+                self.events.put(("stats", stats))
+                self._check()
+
+            result = self._call(self.curve_func, progress=self._progress, **self.curve_kwargs)
+            if isinstance(result, tuple):
+                curve, d_c = result
+            else:
+                curve, d_c = result, critical_density(result)
+            self.events.put(("done", curve, d_c))
+        except StudyCancelled:
+            self.events.put(("cancelled",))
+        except Exception as exc:
+            self.events.put(("error", exc))
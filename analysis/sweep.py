@@ -0,0 +1,187 @@
+"""
+Balayage de paramètres en ligne de commande (sans interface graphique).
+
+    python -m analysis.sweep spec.json --out resultats/
+
+Exemple de spécification (toutes les listes sont combinées entre elles) :
+
+    {
+      "n": [32, 64],
+      "densities": {"start": 0.1, "stop": 0.95, "num": 18},
+      "neighbors": [4, 8],
+      "p_fire": [1.0, 0.8],
+      "start_cells": [[0, 0]],
+      "trials": 500,
+      "seed": 1234,
+      "engine": "ensemble",
+      "chunk": 100
+    }
+
+Sorties dans le dossier --out :
+  spec.json                        copie de la spécification
+  trials/pPPPPP_cCCCC.npz          métriques par essai, une archive par paquet
+  aggregate.csv                    une ligne de statistiques par point terminé
+  checkpoint.json                  avancement (paquets terminés par point)
+
+Relancer la même commande reprend le balayage là où il s'est arrêté :
+les paquets déjà écrits ne sont pas recalculés.
+"""
+import argparse
+import csv
+import itertools
+import json
+import os
+import sys
+
+import numpy as np
+
+from analysis.monte_carlo import METRICS, run_trials, summarize_accumulator, _accumulate
+
+
+POINT_FIELDS = ["point", "n", "density", "neighbors", "p_fire", "start_i", "start_j"]
+STAT_FIELDS = [
+    "trials_used", "trials_run", "theta", "theta_var", "theta_ci_low", "theta_ci_high",
+    "burned_mean", "burned_var", "time_mean", "time_var", "frontier_mean", "frontier_var",
+    "burned_q05", "burned_q50", "burned_q95", "time_q05", "time_q50", "time_q95",
+]
+
+
+def _as_list(v):
+    return list(v) if isinstance(v, (list, tuple)) else [v]
+
+
+def sweep_points(spec):
+    """Liste des points (dict de paramètres) du produit cartésien de la spécification."""
+    dens = spec["densities"]
+    if isinstance(dens, dict):
+        dens = np.linspace(dens["start"], dens["stop"], int(dens["num"])).tolist()
+    dens = [round(float(d), 6) for d in _as_list(dens)]
+
+    points = []
+    for n, neighbors, p_fire, start, d in itertools.product(
+        _as_list(spec["n"]),
+        _as_list(spec.get("neighbors", 4)),
+        _as_list(spec.get("p_fire", 1.0)),
+        spec.get("start_cells", [[0, 0]]),
+        dens,
+    ):
+        points.append({
+            "n": int(n),
+            "density": d,
+            "neighbors": int(neighbors),
+            "p_fire": float(p_fire),
+            "start_cell": (int(start[0]), int(start[1])),
+        })
+    return points
+
+
+def _write_json(path, data):
+    """Écriture atomique (fichier temporaire puis renommage)."""
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp, path)
+
+
+def _chunk_path(out, p, c):
+    return os.path.join(out, "trials", f"p{p:05d}_c{c:05d}.npz")
+
+
+def _iter_point(out, p, chunks):
+    """Paquets d'un point relus un par un (jamais tous en mémoire)."""
+    for c in range(chunks):
+        with np.load(_chunk_path(out, p, c)) as z:
+            yield {k: z[k] for k in METRICS}
+
+
+def _csv_point_ids(path):
+    if not os.path.exists(path):
+        return set()
+    with open(path, newline="", encoding="utf-8") as f:
+        return {int(row["point"]) for row in csv.DictReader(f)}
+
+
+def run_sweep(spec, out, workers=None, log=print):
+    """
+    Exécute (ou reprend) le balayage décrit par spec, résultats dans out.
+    Chaque point utilise le même seed (comme theta_curve) ; le paquet c d'un
+    point correspond aux essais [c × chunk, (c+1) × chunk) de ce seed.
+    """
+    os.makedirs(os.path.join(out, "trials"), exist_ok=True)
+
+    spec_path = os.path.join(out, "spec.json")
+    if os.path.exists(spec_path):
+        with open(spec_path, encoding="utf-8") as f:
+            if json.load(f) != spec:
+                raise ValueError(f"{out} contient un balayage d'une autre spécification")
+    else:
+        _write_json(spec_path, spec)
+
+    ckpt_path = os.path.join(out, "checkpoint.json")
+    ckpt = {"chunks": {}, "done": []}
+    if os.path.exists(ckpt_path):
+        with open(ckpt_path, encoding="utf-8") as f:
+            ckpt = json.load(f)
+
+    trials = int(spec.get("trials", 200))
+    chunk = int(spec.get("chunk", trials))
+    seed = spec.get("seed")
+    engine = spec.get("engine", "forest")
+    n_chunks = -(-trials // chunk)
+
+    csv_path = os.path.join(out, "aggregate.csv")
+    points = sweep_points(spec)
+
+    for p, pt in enumerate(points):
+        if p in ckpt["done"]:
+            continue
+
+        for c in range(ckpt["chunks"].get(str(p), 0), n_chunks):
+            a, b = c * chunk, min((c + 1) * chunk, trials)
+            # flux des essais a, a+1, ... du seed
+            root = np.random.SeedSequence(seed, n_children_spawned=a)
+            res = run_trials(pt["n"], pt["density"], pt["neighbors"], pt["p_fire"], pt["start_cell"],
+                             b - a, root, engine=engine, workers=workers)
+            np.savez_compressed(_chunk_path(out, p, c), trials_run=b - a, **res)
+
+            ckpt["chunks"][str(p)] = c + 1
+            _write_json(ckpt_path, ckpt)
+
+        acc = _accumulate(_iter_point(out, p, n_chunks))
+        acc.trials_run = trials
+        stats = summarize_accumulator(acc) or {"trials_used": 0}
+        row = {"point": p, "n": pt["n"], "density": pt["density"], "neighbors": pt["neighbors"],
+               "p_fire": pt["p_fire"], "start_i": pt["start_cell"][0], "start_j": pt["start_cell"][1]}
+        row.update(stats)
+
+        if p not in _csv_point_ids(csv_path):
+            new_file = not os.path.exists(csv_path)
+            with open(csv_path, "a", newline="", encoding="utf-8") as f:
+                w = csv.DictWriter(f, fieldnames=POINT_FIELDS + STAT_FIELDS, extrasaction="ignore", restval="")
+                if new_file:
+                    w.writeheader()
+                w.writerow(row)
+
+        ckpt["done"].append(p)
+        _write_json(ckpt_path, ckpt)
+        log(f"[{len(ckpt['done'])}/{len(points)}] point {p} {pt} θ = {stats.get('theta', float('nan')):.4f}")
+
+    return csv_path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Balayage Monte-Carlo de percolation (sans GUI).")
+    parser.add_argument("spec", help="fichier JSON de spécification du balayage")
+    parser.add_argument("--out", required=True, help="dossier de résultats (reprise si existant)")
+    parser.add_argument("--workers", type=int, default=None, help="nombre de processus")
+    args = parser.parse_args(argv)
+
+    with open(args.spec, encoding="utf-8") as f:
+        spec = json.load(f)
+
+    run_sweep(spec, args.out, workers=args.workers)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
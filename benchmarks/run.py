@@ -0,0 +1,205 @@
+"""
+Mesures de performance : débit de step(), essais/s, temps de rendu GUI.
+
+    python -m benchmarks.run --save base.json           # mesure + référence
+    python -m benchmarks.run --compare base.json        # mesure + comparaison
+    python -m benchmarks.run --quick                    # tailles réduites
+
+Chaque mesure est enregistrée en JSON sous la forme
+{"value": ..., "unit": ..., "better": "higher" | "lower"}.
+--compare signale toute mesure dégradée de plus de --tolerance
+(10 % par défaut) et renvoie alors un code de sortie 1.
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+
+import numpy as np
+
+from model.forest import Forest
+from analysis.monte_carlo import run_one_trial, theta_curve
+
+
+SIZES = (32, 128, 512, 1024, 4096)
+QUICK_SIZES = (32, 128, 512)
+DENSITIES = {4: (0.55, 0.593, 0.65), 8: (0.38, 0.407, 0.45)}  # autour du seuil
+ENGINES = ("loop", "vectorized", "sparse", "striped")
+
+
+def _timeit(func, min_time=0.2, min_repeat=3, max_repeat=1000, setup=None):
+    """
+    Meilleur temps d'exécution de func() sur plusieurs répétitions.
+    setup() : appelé avant chaque répétition, hors mesure.
+    """
+    best = float("inf")
+    total = 0.0
+    k = 0
+    while (total < min_time or k < min_repeat) and k < max_repeat:
+        if setup is not None:
+            setup()
+        t0 = time.perf_counter()
+        func()
+        dt = time.perf_counter() - t0
+        best = min(best, dt)
+        total += dt
+        k += 1
+    return best
+
+
+def _central_tree(forest):
+    trees = np.argwhere(forest.grid == forest.TREE)
+    c = (forest.n - 1) / 2
+    return tuple(trees[np.argmin(np.abs(trees - c).sum(axis=1))])
+
+
+def bench_step(sizes, max_steps=50, seed=0):
+    """Cellules mises à jour par seconde (n² × pas / temps) pour chaque moteur."""
+    out = {}
+    for n in sizes:
+        for neighbors, dens in DENSITIES.items():
+            for d in dens:
+                for engine in ENGINES:
+                    if engine == "loop" and n > 512:
+                        continue  # référence Python : trop lente au-delà
+                    f = Forest(n, d, neighbors=neighbors, p_fire=1.0,
+                               rng=np.random.default_rng(seed), engine=engine)
+                    start = _central_tree(f)
+
+                    def setup():
+                        # reset() décompacte tout le terrain : hors de la mesure
+                        f.reset()
+                        f.ignite_at(*start)
+
+                    def run():
+                        for _ in range(max_steps):
+                            if not f.step():
+                                break
+
+                    dt = _timeit(run, max_repeat=5 if n >= 1024 else 50, setup=setup)
+                    steps = max(1, f.iteration)
+                    out[f"step/{engine}/n={n}/d={d}/nb={neighbors}"] = {
+                        "value": n * n * steps / dt, "unit": "cells/s", "better": "higher",
+                    }
+    return out
+
+
+def bench_trials(sizes, trials=20, seed=0):
+    """Essais/s de run_one_trial et de theta_curve (18 densités)."""
+    out = {}
+    for n in sizes:
+        if n > 128:
+            continue  # essais complets : tailles de l'étude statistique
+        for p_fire in (1.0, 0.8):
+            rng = np.random.default_rng(seed)
+
+            def run():
+                for _ in range(trials):
+                    run_one_trial(n, 0.6, 4, p_fire, (0, 0), rng)
+
+            dt = _timeit(run, max_repeat=3)
+            out[f"run_one_trial/n={n}/p_fire={p_fire}"] = {
+                "value": trials / dt, "unit": "trials/s", "better": "higher",
+            }
+
+        for engine in ("forest", "ensemble"):
+            dens = np.linspace(0.1, 0.95, 18)
+            dt = _timeit(lambda: theta_curve(n, dens, 4, 0.8, (0, 0), trials=trials, seed=seed, engine=engine),
+                         max_repeat=3)
+            out[f"theta_curve/{engine}/n={n}"] = {
+                "value": 18 * trials / dt, "unit": "trials/s", "better": "higher",
+            }
+    return out
+
+
+def bench_draw(sizes):
+    """Temps d'un appel à FeuForetApp.draw() (nécessite un affichage)."""
+    try:
+        from view.app import FeuForetApp
+        app = FeuForetApp()
+    except Exception as exc:  # pas d'affichage (machine de calcul)
+        print(f"draw() ignoré : {exc}", file=sys.stderr)
+        return {}
+
+    out = {}
+    try:
+        app.withdraw()
+        for n in sizes:
+            if n > 1024:
+                continue
+            app.size_var.set(n)
+            app.zoom_var.set(max(1, 512 // n))
+            app._resize_world()
+            dt = _timeit(app.draw, max_repeat=50)
+            out[f"draw/n={n}"] = {"value": dt * 1e3, "unit": "ms", "better": "lower"}
+    finally:
+        app.destroy()
+    return out
+
+
+def run_all(quick=False):
+    sizes = QUICK_SIZES if quick else SIZES
+    results = {}
+    results.update(bench_step(sizes))
+    results.update(bench_trials(sizes))
+    results.update(bench_draw(sizes))
+    return {
+        "meta": {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.platform(),
+            "quick": quick,
+        },
+        "results": results,
+    }
+
+
+def compare(current, baseline, tolerance=0.10):
+    """Liste des (nom, ancien, nouveau, rapport, dégradé) pour les mesures communes."""
+    rows = []
+    for name, cur in current["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            continue
+        ratio = cur["value"] / base["value"] if base["value"] else float("inf")
+        if cur["better"] == "higher":
+            worse = ratio < 1 - tolerance
+        else:
+            worse = ratio > 1 + tolerance
+        rows.append((name, base["value"], cur["value"], ratio, worse))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks du modèle de percolation.")
+    parser.add_argument("--quick", action="store_true", help="tailles réduites")
+    parser.add_argument("--save", help="écrit les mesures dans ce fichier JSON")
+    parser.add_argument("--compare", help="compare à une référence JSON")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="écart toléré (défaut 0.10)")
+    args = parser.parse_args(argv)
+
+    current = run_all(quick=args.quick)
+    for name, r in current["results"].items():
+        print(f"{name:50s} {r['value']:14.4g} {r['unit']}")
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(current, f, indent=2)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        rows = compare(current, baseline, args.tolerance)
+        print()
+        for name, old, new, ratio, worse in rows:
+            flag = "  RÉGRESSION" if worse else ""
+            print(f"{name:50s} {old:12.4g} → {new:12.4g}  ×{ratio:.2f}{flag}")
+        if any(r[4] for r in rows):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
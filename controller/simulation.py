@@ -1,20 +1,77 @@
+import numpy as np
+
+from model.forest import frontier_mask, padded_offsets
+
+
 class SimulationController:
     """
     Contrôleur temps réel : Start / Pause / Restart
     Le modèle Forest contient l'état.
+
+    Les métriques sont tenues à jour de façon incrémentale à partir des
+    changements de chaque pas (forest.last_burned / forest.last_ignited,
+    demandés à la forêt par forest.track_changes) :
+    lecture en O(1), mise à jour en O(cellules modifiées).
+    Passer par reset() / ignite_at() du contrôleur pour garder ces compteurs
+    cohérents (ou appeler resync() après une modification directe de la forêt).
     """
 
     def __init__(self, forest):
         self.forest = forest
+        forest.track_changes = True
+        self.resync()
+
+    def resync(self):
+        """Recalcule entièrement les métriques à partir de la grille."""
+        f = self.forest
+        self._off4 = padded_offsets(f.n, 4)
+        self._corner = f.cell_index(f.n - 1, f.n - 1)
+
+        self._frontier = np.zeros(f._cells.shape, dtype=bool)
+        self._frontier[1:-1, 1:-1] = frontier_mask(f.grid == f.BURNED, f.grid == f.TREE)
+        self._frontier = self._frontier.reshape(-1)
+
+        self._frontier_count = int(np.count_nonzero(self._frontier))
+        self._burned_count = f.burned_count()
+
+    def reset(self):
+        self.forest.reset()
+        self.resync()
+
+    def ignite_at(self, i, j):
+        ok = self.forest.ignite_at(i, j)
+        if ok:
+            self._apply(np.empty(0, dtype=np.intp), np.array([self.forest.cell_index(i, j)]))
+        return ok
 
     def step(self):
-        return self.forest.step()
+        alive = self.forest.step()
+        if alive:
+            self._apply(self.forest.last_burned, self.forest.last_ignited)
+        return alive
+
+    def _apply(self, burned, ignited):
+        """Met à jour les compteurs pour les cellules FIRE → BURNED et TREE → FIRE."""
+        cells = self.forest._cells.reshape(-1)
+        self._burned_count += burned.size
+
+        # seules les cellules nouvellement brûlées et les voisines des arbres
+        # qui viennent de s'enflammer peuvent changer de statut « frontière »
+        # (une cellule frontière est brûlée et le reste : on ne regarde que celles-là,
+        # ce qui écarte aussi la bordure de self._cells)
+        affected = np.unique(np.concatenate((burned, (ignited[:, None] + self._off4).ravel())))
+        affected = affected[cells[affected] == self.forest.BURNED]
+        status = (cells[affected[:, None] + self._off4] == self.forest.TREE).any(axis=1)
+
+        self._frontier_count += int(np.count_nonzero(status)) - int(np.count_nonzero(self._frontier[affected]))
+        self._frontier[affected] = status
 
     def metrics(self):
+        f = self.forest
         return {
-            "iteration": self.forest.iteration,
-            "burned_count": self.forest.burned_count(),
-            "burned_fraction": self.forest.burned_fraction(),
-            "frontier": self.forest.burned_frontier_count(),
-            "percolates": self.forest.percolates(),
+            "iteration": f.iteration,
+            "burned_count": self._burned_count,
+            "burned_fraction": self._burned_count / float(f.n * f.n),
+            "frontier": self._frontier_count,
+            "percolates": bool(f._cells.flat[self._corner] in (f.FIRE, f.BURNED)),
         }
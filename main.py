@@ -1,4 +1,14 @@
+import os
+
+from model import instrumentation
 from view.app import FeuForetApp
 
 if __name__ == "__main__":
-    FeuForetApp().mainloop()
+    # PERCOLATION_TRACE=trace.json : enregistre la session (trace Chrome / Perfetto)
+    trace = os.environ.get("PERCOLATION_TRACE")
+    if trace:
+        with instrumentation.recording() as rec:
+            FeuForetApp().mainloop()
+        rec.to_chrome_trace(trace)
+    else:
+        FeuForetApp().mainloop()
@@ -1,5 +1,151 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import numpy as np
 
+from model import instrumentation
+
+
+# Version du modèle : à incrémenter dès qu'un changement modifie les résultats
+# obtenus pour un seed donné (règles, consommation des tirages, statistiques
+# renvoyées...). Elle fait partie des clés du cache de résultats (analysis/cache.py).
+MODEL_VERSION = 5
+
+
+# Décalages des voisins (di, dj) selon le voisinage
+NEIGHBOR_OFFSETS = {
+    4: [(-1, 0), (1, 0), (0, -1), (0, 1)],
+    8: [(-1, 0), (1, 0), (0, -1), (0, 1),
+        (-1, -1), (-1, 1), (1, -1), (1, 1)],
+}
+
+
+def _shifted(src, di, dj, out):
+    """
+    out[i, j] = src[i - di, j - dj] (0 hors de la grille).
+    Autrement dit : chaque cellule de src est « poussée » vers son voisin (di, dj).
+    Opère sur les deux derniers axes (grille simple ou pile de grilles).
+    """
+    out[...] = 0
+    n0, n1 = src.shape[-2], src.shape[-1]
+    ti = slice(max(di, 0), n0 + min(di, 0))
+    si = slice(max(-di, 0), n0 + min(-di, 0))
+    tj = slice(max(dj, 0), n1 + min(dj, 0))
+    sj = slice(max(-dj, 0), n1 + min(-dj, 0))
+    out[..., ti, tj] = src[..., si, sj]
+    return out
+
+
+def burning_neighbor_count(fire, neighbors, out=None):
+    """
+    Nombre de voisins en feu de chaque cellule (4 ou 8 voisins).
+    fire : masque booléen (..., n, n). Renvoie un tableau uint8 de même forme.
+    out : tampon uint8 préalloué (facultatif). Les décalages sont ajoutés
+    directement sur des tranches de out : aucun tableau temporaire.
+    """
+    count = np.zeros(fire.shape, dtype=np.uint8) if out is None else out
+    count[...] = 0
+    src = fire.view(np.uint8)
+    n0, n1 = fire.shape[-2], fire.shape[-1]
+    for di, dj in NEIGHBOR_OFFSETS[neighbors]:
+        ti = slice(max(di, 0), n0 + min(di, 0))
+        si = slice(max(-di, 0), n0 + min(-di, 0))
+        tj = slice(max(dj, 0), n1 + min(dj, 0))
+        sj = slice(max(-dj, 0), n1 + min(-dj, 0))
+        count[..., ti, tj] += src[..., si, sj]
+    return count
+
+
+def ignition_draws(count, candidates, p_fire, rng, out=None):
+    """
+    Tirage groupé des allumages.
+
+    Un arbre exposé à k voisins en feu subit k tentatives indépendantes
+    de probabilité p_fire : il s'enflamme avec probabilité 1 - (1 - p_fire)^k.
+    candidates : masque des arbres exposés (count > 0).
+    out : tampon booléen préalloué (facultatif) recevant le résultat ;
+    out = candidates fait le tirage sur place (candidates est alors écrasé).
+    Renvoie le masque des arbres qui s'enflamment.
+    """
+    if p_fire >= 1.0:
+        return candidates
+    k = count[candidates]
+    if out is None:
+        ignite = np.zeros(candidates.shape, dtype=bool)
+    else:
+        ignite = out
+        if ignite is not candidates:
+            ignite[...] = False
+    if k.size == 0:
+        return ignite
+    p_ignite = 1.0 - (1.0 - p_fire) ** k
+    ignite[candidates] = rng.random(k.size) < p_ignite
+    return ignite
+
+
+# Métriques calculées sur la grille par grid_metrics
+GRID_METRICS = ("burned_count", "burned_fraction", "frontier", "percolates")
+
+
+def frontier_mask(burned, tree):
+    """
+    Cellules brûlées ayant au moins un arbre intact parmi leurs 4 voisins.
+    burned, tree : masques booléens (..., n, n) ; opère sur les deux derniers axes.
+    """
+    near = np.zeros(tree.shape, dtype=bool)
+    near[..., 1:, :] |= tree[..., :-1, :]
+    near[..., :-1, :] |= tree[..., 1:, :]
+    near[..., :, 1:] |= tree[..., :, :-1]
+    near[..., :, :-1] |= tree[..., :, 1:]
+    return burned & near
+
+
+def grid_metrics(grid, keys=None):
+    """
+    Métriques d'une grille (ou d'une pile de grilles (..., n, n)) en une seule
+    passe : les masques brûlé / arbre sont calculés une fois et partagés entre
+    comptage, fraction, frontière et percolation.
+    keys : métriques voulues parmi burned_count, burned_fraction, frontier,
+    percolates (toutes par défaut) ; seules celles-ci sont calculées et renvoyées.
+    """
+    keys = GRID_METRICS if keys is None else [k for k in GRID_METRICS if k in keys]
+    m = {}
+    if "burned_count" in keys or "burned_fraction" in keys or "frontier" in keys:
+        burned = (grid == Forest.BURNED)
+        if "burned_count" in keys or "burned_fraction" in keys:
+            count = np.count_nonzero(burned, axis=(-2, -1))
+            if "burned_count" in keys:
+                m["burned_count"] = count
+            if "burned_fraction" in keys:
+                m["burned_fraction"] = count / float(grid.shape[-2] * grid.shape[-1])
+        if "frontier" in keys:
+            m["frontier"] = np.count_nonzero(frontier_mask(burned, grid == Forest.TREE), axis=(-2, -1))
+    if "percolates" in keys:
+        corner = grid[..., -1, -1]
+        m["percolates"] = (corner == Forest.FIRE) | (corner == Forest.BURNED)
+    return m
+
+
+_THREAD_POOL = None
+
+
+def _thread_pool():
+    """Pool de threads partagé par les forêts du moteur "striped" (créé au premier usage)."""
+    global _THREAD_POOL
+    if _THREAD_POOL is None:
+        _THREAD_POOL = ThreadPoolExecutor(max_workers=os.cpu_count() or 1)
+    return _THREAD_POOL
+
+
+def padded_offsets(n, neighbors):
+    """
+    Décalages d'indices plats vers les voisins dans une grille bordée
+    (n+2)×(n+2) : la bordure vide évite tout test de dépassement.
+    """
+    w = n + 2
+    return np.array([di * w + dj for di, dj in NEIGHBOR_OFFSETS[neighbors]], dtype=np.intp)
+
 
 class Forest:
     """
@@ -10,6 +156,25 @@ class Forest:
       1 : arbre (intact)
       2 : feu
       3 : brûlé
+
+    Moteurs de propagation (paramètre engine) :
+      "loop"       : boucle Python cellule par cellule (référence)
+      "vectorized" : masques décalés sur toute la grille + tirages groupés
+      "sparse"     : front actif tenu comme ensemble d'indices, mise à jour sur place
+                     (coût d'un pas proportionnel à la taille du front)
+      "striped"    : calcul de "vectorized" par bandes de lignes (+ une ligne de halo
+                     de chaque côté) sur un pool de threads ; NumPy relâche le GIL
+                     dans ses noyaux, les bandes avancent donc en parallèle.
+                     Chaque bande a son propre flux aléatoire (rng.spawn) : résultat
+                     reproductible pour un seed et un nombre de bandes (stripes) fixés.
+    Les moteurs suivent la même loi ; seules les suites de tirages diffèrent.
+
+    La grille est stockée avec une bordure vide (self._cells, (n+2)×(n+2)) ;
+    self.grid en est la vue intérieure n×n, toujours modifiée sur place.
+    Le terrain initial (figé) n'est gardé que sous forme de masque d'arbres
+    compacté (1 bit par case) ; initial_grid le reconstruit à la demande.
+    Les tampons de travail des moteurs sont alloués une fois : aucun pas
+    n'alloue de copie de la grille.
     """
 
     EMPTY = 0
@@ -17,49 +182,353 @@ class Forest:
     FIRE = 2
     BURNED = 3
 
-    def __init__(self, n, density, neighbors=4, p_fire=1.0, rng=None):
+    ENGINES = ("loop", "vectorized", "sparse", "striped")
+
+    def __init__(self, n, density, neighbors=4, p_fire=1.0, rng=None, engine="vectorized",
+                 record_times=False, stripes=None, tree_bits=None):
         self.n = int(n)
         self.density = float(density)
         self.neighbors = int(neighbors)  # 4 ou 8
         self.p_fire = float(p_fire)
 
+        if engine not in self.ENGINES:
+            raise ValueError(f"engine inconnu : {engine!r} (attendu : {', '.join(self.ENGINES)})")
+        self.engine = engine
+
         self.rng = rng if rng is not None else np.random.default_rng()
 
-        # Terrain figé (reproductible si seed fixe)
-        self.initial_grid = (self.rng.random((self.n, self.n)) < self.density).astype(np.int8) * self.TREE
-        self.grid = self.initial_grid.copy()
+        self._cells = np.zeros((self.n + 2, self.n + 2), dtype=np.int8)
+        self.grid = self._cells[1:-1, 1:-1]
+
+        # tirages aléatoires consommés (terrain + propagation) ; le moteur
+        # "vectorized" ne compte ses tirages que pendant un enregistrement
+        self.draws = 0
+        if tree_bits is not None:
+            # terrain fourni (masque compacté, ex. load_run) : aucun tirage
+            self._tree_bits = np.array(tree_bits, dtype=np.uint8)
+            for a, b in self._row_blocks():
+                self.grid[a:b] = np.unpackbits(self._tree_bits[a:b], axis=1, count=self.n)
+        else:
+            # Terrain figé (reproductible si seed fixe), tiré par blocs de lignes :
+            # même suite de tirages que rng.random((n, n)) sans tableau float64 n×n
+            self._tree_bits = np.empty((self.n, (self.n + 7) // 8), dtype=np.uint8)
+            with instrumentation.phase("terrain"):
+                for a, b in self._row_blocks():
+                    trees = self.rng.random((b - a, self.n)) < self.density
+                    self.grid[a:b] = trees * self.TREE
+                    self._tree_bits[a:b] = np.packbits(trees, axis=1)
+            self.draws = self.n * self.n
+            if instrumentation.active() is not None:
+                instrumentation.active().add_draws(self.draws)
+
+        # tampons de travail (alloués au premier pas du moteur concerné)
+        self._back = None
+        self._work = None
+
+        # moteur "striped" : bandes [a, b) de lignes, un flux aléatoire par bande
+        self._stripes = None
+        if engine == "striped":
+            k = max(1, min(self.n, stripes if stripes is not None else os.cpu_count() or 1))
+            bounds = np.linspace(0, self.n, k + 1).astype(int)
+            self._stripes = [{"a": int(a), "b": int(b), "rng": r}
+                             for a, b, r in zip(bounds[:-1], bounds[1:], self.rng.spawn(k))]
+
+        # front actif (moteur "sparse") : indices plats dans self._cells
+        self._front = np.empty(0, dtype=np.intp)
+        self._offsets = padded_offsets(self.n, self.neighbors)
+
+        # changements du dernier pas (indices plats dans self._cells) :
+        # cellules passées FIRE → BURNED et TREE → FIRE. Les moteurs à grille
+        # complète ne les calculent (deux parcours n×n) que si un consommateur
+        # les demande : track_changes (SimulationController), record_times ou
+        # un enregistrement d'instrumentation ; sinon ils valent None après un pas.
+        self.track_changes = False
+        self.last_burned = np.empty(0, dtype=np.intp)
+        self.last_ignited = np.empty(0, dtype=np.intp)
 
         self.iteration = 0
 
+        # temps d'allumage de chaque case (-1 : jamais), grille bordée comme
+        # self._cells ; int16 tant que le nombre de cases le permet
+        self._times = None
+        if record_times:
+            dtype = np.int16 if self.n * self.n < np.iinfo(np.int16).max else np.int32
+            self._times = np.full(self._cells.shape, -1, dtype=dtype)
+
+    def _row_blocks(self):
+        """Découpage des lignes en blocs d'environ 1 M cases."""
+        rows = max(1, (1 << 20) // self.n)
+        return [(a, min(a + rows, self.n)) for a in range(0, self.n, rows)]
+
+    @property
+    def initial_grid(self):
+        """Terrain initial (copie int8 n×n reconstruite depuis le masque compacté)."""
+        trees = np.unpackbits(self._tree_bits, axis=1, count=self.n)
+        return trees.astype(np.int8) * self.TREE
+
+    @initial_grid.setter
+    def initial_grid(self, grid):
+        self._tree_bits = np.packbits(np.asarray(grid) == self.TREE, axis=1)
+
+    def iter_row_blocks(self):
+        """Masque des arbres du terrain initial, par blocs de lignes (sans copie n×n)."""
+        for a, b in self._row_blocks():
+            yield np.unpackbits(self._tree_bits[a:b], axis=1, count=self.n).view(bool)
+
     def reset(self):
         """Remet la grille au terrain initial sans feu."""
-        self.grid = self.initial_grid.copy()
+        with instrumentation.phase("reset"):
+            for a, b in self._row_blocks():
+                np.multiply(np.unpackbits(self._tree_bits[a:b], axis=1, count=self.n), self.TREE,
+                            out=self.grid[a:b], casting="unsafe")
+        self._front = np.empty(0, dtype=np.intp)
+        self.last_burned = np.empty(0, dtype=np.intp)
+        self.last_ignited = np.empty(0, dtype=np.intp)
         self.iteration = 0
+        if self._times is not None:
+            self._times.fill(-1)
+
+    def cell_index(self, i, j):
+        """Indice plat de (i,j) dans la grille bordée self._cells."""
+        return (i + 1) * (self.n + 2) + (j + 1)
+
+    def _cells_index(self, mask):
+        """Indices plats (dans self._cells) des cellules vraies d'un masque n×n."""
+        r, c = np.nonzero(mask)
+        return (r + 1) * (self.n + 2) + (c + 1)
 
     def ignite_at(self, i, j):
         """Allume le feu en (i,j) si c'est un arbre."""
         if 0 <= i < self.n and 0 <= j < self.n and self.grid[i, j] == self.TREE:
             self.grid[i, j] = self.FIRE
+            if self.engine == "sparse":
+                self._front = np.append(self._front, self.cell_index(i, j))
+            if self._times is not None:
+                self._times[i + 1, j + 1] = self.iteration
             return True
         return False
 
+    def is_burning(self):
+        """Reste-t-il au moins une cellule en feu ? (O(1) avec le moteur "sparse")"""
+        if self.engine == "sparse":
+            return self._front.size > 0
+        return bool(np.any(self.grid == self.FIRE))
+
+    def burn_cluster(self, i, j, target=None):
+        """
+        Cas p_fire = 1 : la propagation est un parcours en largeur déterministe.
+        Brûle directement tout l'amas d'arbres contenant (i,j), couche par couche,
+        sans pas de temps : l'état final (grille, iteration) est identique
+        à celui obtenu en appelant step() jusqu'à extinction.
+        iteration = excentricité de (i,j) dans l'amas + 1 (dernier pas sans allumage).
+        target=(ti, tj) : arrêt dès que cette case brûle (ou tout de suite si ce
+        n'est pas un arbre) ; l'état est alors partiel, seul percolates() a un sens
+        pour target = coin.
+        Renvoie False si (i,j) n'est pas un arbre.
+        """
+        if self.p_fire < 1.0:
+            raise ValueError("burn_cluster suppose p_fire = 1")
+        with instrumentation.phase("burn_cluster"):
+            return self._burn_cluster(i, j, target)
+
+    def _burn_cluster(self, i, j, target):
+        if not self.ignite_at(i, j):
+            return False
+
+        cells = self._cells.reshape(-1)
+        tree = (cells == self.TREE)
+        offs = self._offsets
+        stamp = np.empty(tree.size, dtype=np.intp)
+
+        front = np.array([self.cell_index(i, j)], dtype=np.intp)
+        stop = None if target is None else self.cell_index(*target)
+        layers = []
+        while front.size:
+            layers.append(front)
+            if stop is not None and not tree[stop]:
+                break
+            cand = (front[:, None] + offs).ravel()
+            cand = cand[tree[cand]]
+            # dédoublonnage en O(k) : on garde la dernière occurrence de chaque indice
+            k = np.arange(cand.size)
+            stamp[cand] = k
+            cand = cand[stamp[cand] == k]
+            tree[cand] = False
+            front = cand
+
+        burned = np.concatenate(layers)
+        cells[burned] = self.BURNED
+        if self._times is not None:
+            # couche k du parcours = cases allumées au pas k
+            times = self._times.reshape(-1)
+            for k, layer in enumerate(layers):
+                times[layer] = self.iteration + k
+        self._front = np.empty(0, dtype=np.intp)
+        self.last_burned = burned
+        self.last_ignited = np.empty(0, dtype=np.intp)
+        self.iteration += len(layers)
+        return True
+
     def step(self):
         """
         Un pas d'évolution :
         - les cellules en feu deviennent brûlées
         - elles enflamment leurs voisins (4 ou 8) avec probabilité p_fire
         """
-        burning = np.argwhere(self.grid == self.FIRE)
-        if burning.size == 0:
+        rec = instrumentation.active()
+        track = self.track_changes or self._times is not None or rec is not None
+        if rec is None:
+            alive = self._step(track)
+        else:
+            start, draws = time.perf_counter(), self.draws
+            alive = self._step(track)
+            if alive:
+                rec.add_step(self.last_burned.size, self.last_burned.size + self.last_ignited.size,
+                             self.draws - draws, start, time.perf_counter() - start)
+
+        if alive and self._times is not None:
+            self._times.reshape(-1)[self.last_ignited] = self.iteration
+        return alive
+
+    def _step(self, track):
+        if self.engine == "vectorized":
+            return self._step_vectorized(track)
+        if self.engine == "sparse":
+            return self._step_sparse()
+        if self.engine == "striped":
+            return self._step_striped(track)
+        return self._step_loop(track)
+
+    def _step_sparse(self):
+        front = self._front
+        if front.size == 0:
+            return False
+
+        cells = self._cells.reshape(-1)
+
+        # tentatives : une par couple (cellule en feu, voisin arbre)
+        cand = (front[:, None] + self._offsets).ravel()
+        cand = cand[cells[cand] == self.TREE]
+        if self.p_fire >= 1.0:
+            ignite = np.unique(cand)
+        else:
+            cand, k = np.unique(cand, return_counts=True)
+            ignite = cand[self.rng.random(cand.size) < 1.0 - (1.0 - self.p_fire) ** k]
+            self.draws += cand.size
+
+        # mise à jour sur place ; le front suivant remplace le courant
+        cells[front] = self.BURNED
+        cells[ignite] = self.FIRE
+        self._front = ignite
+        self.last_burned = front
+        self.last_ignited = ignite
+
+        self.iteration += 1
+        return True
+
+    def _step_vectorized(self, track):
+        if self._work is None:
+            shape = (self.n, self.n)
+            self._work = {
+                "fire": np.empty(shape, dtype=bool),
+                "ignite": np.empty(shape, dtype=bool),
+                "count": np.empty(shape, dtype=np.uint8),
+            }
+        w = self._work
+
+        fire = np.equal(self.grid, self.FIRE, out=w["fire"])
+        if not fire.any():
+            return False
+
+        # 3 octets par case en tout : feu, compteur, puis candidats tirés sur place
+        count = burning_neighbor_count(fire, self.neighbors, out=w["count"])
+        candidates = np.equal(self.grid, self.TREE, out=w["ignite"])
+        np.logical_and(candidates, count, out=candidates)
+        if self.p_fire < 1.0 and instrumentation.active() is not None:
+            self.draws += int(np.count_nonzero(candidates))
+        ignite = ignition_draws(count, candidates, self.p_fire, self.rng, out=candidates)
+
+        if track:
+            self.last_burned = self._cells_index(fire)
+            self.last_ignited = self._cells_index(ignite)
+        else:
+            self.last_burned = self.last_ignited = None
+        np.copyto(self.grid, self.BURNED, where=fire)
+        np.copyto(self.grid, self.FIRE, where=ignite)
+
+        self.iteration += 1
+        return True
+
+    def _stripe_scan(self, st):
+        """Phase 1 (lecture seule) : feux et allumages de la bande, halo compris."""
+        if "fire" not in st:
+            h = st["b"] - st["a"]
+            st["fire"] = np.empty((h + 2, self.n + 2), dtype=bool)
+            st["count"] = np.empty((h + 2, self.n + 2), dtype=np.uint8)
+            st["ignite_buf"] = np.empty((h, self.n), dtype=bool)
+
+        # lignes a-1 .. b de la grille (bordure vide comprise)
+        block = self._cells[st["a"]:st["b"] + 2]
+        fire = np.equal(block, self.FIRE, out=st["fire"])
+        st["ignite"] = None
+        st["draws"] = 0
+        if not fire.any():
             return False
 
-        new_grid = self.grid.copy()
+        count = burning_neighbor_count(fire, self.neighbors, out=st["count"])[1:-1, 1:-1]
+        candidates = np.equal(block[1:-1, 1:-1], self.TREE, out=st["ignite_buf"])
+        np.logical_and(candidates, count, out=candidates)
+        if self.p_fire < 1.0 and st["record"]:
+            st["draws"] = int(np.count_nonzero(candidates))
+        st["ignite"] = ignition_draws(count, candidates, self.p_fire, st["rng"], out=candidates)
+        return bool(fire[1:-1].any())
+
+    def _stripe_apply(self, st, track):
+        """Phase 2 : mise à jour des lignes propres de la bande ; indices plats modifiés si track."""
+        rows = self.grid[st["a"]:st["b"]]
+        fire = st["fire"][1:-1, 1:-1]
+        np.copyto(rows, self.BURNED, where=fire)
+        np.copyto(rows, self.FIRE, where=st["ignite"])
+        if not track:
+            return None
+        offset = st["a"] * (self.n + 2)
+        return self._cells_index(fire) + offset, self._cells_index(st["ignite"]) + offset
+
+    def _step_striped(self, track):
+        pool = _thread_pool()
+        # les threads du pool ne voient pas un enregistrement propre au thread appelant
+        record = instrumentation.active() is not None
+        for st in self._stripes:
+            st["record"] = record
+
+        # toutes les bandes lisent la grille avant qu'aucune ne l'écrive (halo)
+        burning = list(pool.map(self._stripe_scan, self._stripes))
+        if not any(burning):
+            return False
 
-        if self.neighbors == 4:
-            neigh = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+        active = [st for st in self._stripes if st["ignite"] is not None]
+        changes = list(pool.map(lambda st: self._stripe_apply(st, track), active))
+        if track:
+            self.last_burned = np.concatenate([c[0] for c in changes])
+            self.last_ignited = np.concatenate([c[1] for c in changes])
         else:
-            neigh = [(-1, 0), (1, 0), (0, -1), (0, 1),
-                     (-1, -1), (-1, 1), (1, -1), (1, 1)]
+            self.last_burned = self.last_ignited = None
+        self.draws += sum(st["draws"] for st in active)
+
+        self.iteration += 1
+        return True
+
+    def _step_loop(self, track):
+        burning = np.argwhere(self.grid == self.FIRE)
+        if burning.size == 0:
+            return False
+
+        # double tampon : on lit self.grid et on écrit dans la copie de travail
+        if self._back is None:
+            self._back = np.zeros_like(self._cells)
+        new_grid = self._back[1:-1, 1:-1]
+        new_grid[...] = self.grid
+        neigh = NEIGHBOR_OFFSETS[self.neighbors]
 
         for i, j in burning:
             new_grid[i, j] = self.BURNED
@@ -68,9 +537,18 @@ class Forest:
                 if 0 <= ni < self.n and 0 <= nj < self.n:
                     if self.grid[ni, nj] == self.TREE:
                         # propagation probabiliste
+                        self.draws += 1
                         if self.rng.random() < self.p_fire:
                             new_grid[ni, nj] = self.FIRE
 
+        if track:
+            self.last_burned = self._cells_index(self.grid == self.FIRE)
+            self.last_ignited = self._cells_index((self.grid == self.TREE) & (new_grid == self.FIRE))
+        else:
+            self.last_burned = self.last_ignited = None
+
+        # échange des tampons (self.grid reste la vue intérieure de self._cells)
+        self._cells, self._back = self._back, self._cells
         self.grid = new_grid
         self.iteration += 1
         return True
@@ -81,10 +559,10 @@ class Forest:
         return self.grid[self.n - 1, self.n - 1] in (self.FIRE, self.BURNED)
 
     def burned_count(self):
-        return int(np.sum(self.grid == self.BURNED))
+        return int(np.count_nonzero(self.grid == self.BURNED))
 
     def burned_fraction(self):
-        return float(np.mean(self.grid == self.BURNED))
+        return self.burned_count() / float(self.n * self.n)
 
     def time_to_extinction(self):
         """
@@ -99,26 +577,66 @@ class Forest:
         nombre de cellules brûlées qui sont adjacentes à au moins un arbre intact.
         (Version 4-voisins pour la frontière, lisible et stable.)
         """
-        g = self.grid
-        n = self.n
-        burned = (g == self.BURNED)
-
-        if not burned.any():
-            return 0
-
-        frontier = 0
-        for i in range(n):
-            for j in range(n):
-                if not burned[i, j]:
-                    continue
-                # regarde si au moins un voisin (4) est un arbre intact
-                for di, dj in [(-1,0),(1,0),(0,-1),(0,1)]:
-                    ni, nj = i+di, j+dj
-                    if 0 <= ni < n and 0 <= nj < n and g[ni, nj] == self.TREE:
-                        frontier += 1
-                        break
-        return frontier
+        return int(np.count_nonzero(frontier_mask(self.grid == self.BURNED, self.grid == self.TREE)))
+
+    def metrics(self, keys=None):
+        """
+        Métriques en une seule passe sur la grille (voir grid_metrics) ;
+        keys : sous-ensemble de GRID_METRICS à calculer (toutes par défaut).
+        """
+        with instrumentation.phase("metrics"):
+            m = grid_metrics(self.grid, keys)
+        types = {"burned_count": int, "burned_fraction": float, "frontier": int, "percolates": bool}
+        out = {"iteration": int(self.iteration)}
+        out.update((k, types[k](v)) for k, v in m.items())
+        return out
+
+    # ---------- relecture (record_times=True) ----------
+    @property
+    def ignition_time(self):
+        """Pas d'allumage de chaque case (n×n, -1 si jamais allumée), ou None."""
+        return None if self._times is None else self._times[1:-1, 1:-1]
+
+    def frame(self, t):
+        """
+        Grille après t pas, déduite des temps d'allumage sans re-simulation :
+        allumée avant t → brûlée, allumée à t → en feu, sinon terrain initial.
+        """
+        ign = self.ignition_time
+        if ign is None:
+            raise ValueError("frame() suppose Forest(record_times=True)")
+        g = self.initial_grid
+        g[(ign >= 0) & (ign < t)] = self.BURNED
+        g[ign == t] = self.FIRE
+        return g
+
+    def save_run(self, path):
+        """Enregistre terrain compacté + temps d'allumage (archive .npz)."""
+        if self._times is None:
+            raise ValueError("save_run() suppose Forest(record_times=True)")
+        np.savez_compressed(
+            path, tree_bits=self._tree_bits, ignition_time=self.ignition_time,
+            n=self.n, density=self.density, neighbors=self.neighbors, p_fire=self.p_fire,
+            iteration=self.iteration,
+        )
+
+    @classmethod
+    def load_run(cls, path, engine="vectorized"):
+        """Recharge une exécution de save_run : forêt dans son état final (iteration pas)."""
+        with np.load(path) as z:
+            n = int(z["n"])
+            forest = cls(n, float(z["density"]), neighbors=int(z["neighbors"]), p_fire=float(z["p_fire"]),
+                         engine=engine, record_times=True, tree_bits=z["tree_bits"])
+            forest._times[1:-1, 1:-1] = z["ignition_time"]
+            forest.iteration = int(z["iteration"])
+
+        forest.grid[...] = forest.frame(forest.iteration)
+        fire = forest.grid == forest.FIRE
+        forest.last_ignited = forest._cells_index(fire)
+        if engine == "sparse":
+            forest._front = forest.last_ignited
+        return forest
 
     def snapshot_for_restart(self):
         """Renvoie une copie du terrain initial (pour restart propre)."""
-        return self.initial_grid.copy()
+        return self.initial_grid
@@ -0,0 +1,209 @@
+"""
+Instrumentation (désactivée par défaut).
+
+    from model import instrumentation
+
+    with instrumentation.recording() as rec:
+        monte_carlo(...)
+    print(rec.breakdown())
+    rec.to_chrome_trace("trace.json")     # chrome://tracing ou ui.perfetto.dev
+
+Hors d'un enregistrement, phase() renvoie un gestionnaire de contexte vide
+partagé et Forest.step() ne fait qu'un test : le coût est négligeable.
+
+Pendant un enregistrement sont mesurés :
+- le temps passé dans chaque phase (terrain, step, metrics, trial, draw...),
+- pour chaque pas de Forest : taille du front, cellules modifiées,
+  tirages aléatoires consommés.
+callback(event) est appelé pour chaque événement (dict) au fil de l'eau.
+"""
+import contextlib
+import csv
+import json
+import os
+import threading
+import time
+
+
+# enregistrement couvrant tous les threads (session) et enregistrements
+# propres à un thread ; _local_count permet à phase() de ne rien faire
+# hors enregistrement sans consulter le stockage local du thread
+_session = None
+_local = threading.local()
+_local_count = 0
+_lock = threading.Lock()
+_NULL = contextlib.nullcontext()
+
+
+class Recorder:
+    """
+    Mesures d'un enregistrement.
+    events=False : ne garde que les totaux par phase (mémoire constante).
+    """
+
+    def __init__(self, callback=None, events=True):
+        self.callback = callback
+        self.keep_events = events
+        self.events = []
+        self.totals = {}  # phase -> [appels, secondes]
+        self.counters = {"steps": 0, "front": 0, "changed": 0, "draws": 0}
+        self.origin = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def _emit(self, event):
+        if self.keep_events:
+            self.events.append(event)
+        if self.callback is not None:
+            self.callback(event)
+
+    def add_phase(self, name, start, seconds):
+        with self._lock:
+            t = self.totals.setdefault(name, [0, 0.0])
+            t[0] += 1
+            t[1] += seconds
+            self._emit({"type": "phase", "name": name, "start": start - self.origin, "seconds": seconds,
+                        "pid": os.getpid(), "tid": threading.get_ident()})
+
+    def add_step(self, front, changed, draws, start, seconds):
+        with self._lock:
+            t = self.totals.setdefault("step", [0, 0.0])
+            t[0] += 1
+            t[1] += seconds
+            s = self.counters
+            s["steps"] += 1
+            s["front"] += front
+            s["changed"] += changed
+            s["draws"] += draws
+            self._emit({"type": "step", "name": "step", "start": start - self.origin, "seconds": seconds,
+                        "front": front, "changed": changed, "draws": draws,
+                        "pid": os.getpid(), "tid": threading.get_ident()})
+
+    def add_draws(self, draws):
+        """Tirages consommés hors des pas (terrain...)."""
+        with self._lock:
+            self.counters["draws"] += draws
+
+    # ---------- résultats ----------
+    def breakdown(self):
+        """
+        {"phases": {phase: {"count", "seconds", "mean"}}, "counters": {...}} ;
+        les phases s'emboîtent (trial contient terrain, step...) : leurs temps ne s'additionnent pas.
+        """
+        phases = {name: {"count": c, "seconds": s, "mean": s / c} for name, (c, s) in sorted(self.totals.items())}
+        return {"phases": phases, "counters": dict(self.counters)}
+
+    def state(self):
+        """Totaux transmissibles (ex. depuis un processus du pool) pour merge()."""
+        return {"origin": self.origin, "totals": self.totals, "counters": self.counters,
+                "events": self.events if self.keep_events else []}
+
+    def merge(self, state):
+        with self._lock:
+            for name, (c, s) in state["totals"].items():
+                t = self.totals.setdefault(name, [0, 0.0])
+                t[0] += c
+                t[1] += s
+            for k, v in state["counters"].items():
+                self.counters[k] += v
+            if self.keep_events:
+                # perf_counter est une horloge système monotone : on recale les dates
+                shift = state["origin"] - self.origin
+                self.events.extend(dict(e, start=e["start"] + shift) for e in state["events"])
+
+    # ---------- exports ----------
+    def to_json(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"breakdown": self.breakdown(), "events": self.events}, f, indent=2)
+
+    def to_csv(self, path):
+        """Un événement par ligne (phases et pas)."""
+        fields = ["type", "name", "start", "seconds", "front", "changed", "draws", "pid", "tid"]
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            w = csv.DictWriter(f, fieldnames=fields, restval="")
+            w.writeheader()
+            w.writerows(self.events)
+
+    def to_chrome_trace(self, path):
+        """Format « trace event » (chrome://tracing, Perfetto) : durées + compteurs du front."""
+        trace = []
+        for e in self.events:
+            ts = e["start"] * 1e6
+            trace.append({"name": e["name"], "ph": "X", "ts": ts, "dur": e["seconds"] * 1e6,
+                          "pid": e["pid"], "tid": e["tid"]})
+            if e["type"] == "step":
+                trace.append({"name": "front", "ph": "C", "ts": ts, "pid": e["pid"],
+                              "args": {"front": e["front"], "changed": e["changed"], "draws": e["draws"]}})
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": trace, "displayTimeUnit": "ms"}, f)
+
+
+class _Phase:
+    __slots__ = ("rec", "name", "start")
+
+    def __init__(self, rec, name):
+        self.rec = rec
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.rec.add_phase(self.name, self.start, time.perf_counter() - self.start)
+        return False
+
+
+def active():
+    """Enregistreur courant du thread appelant, ou None hors enregistrement."""
+    if _session is None and not _local_count:
+        return None
+    rec = getattr(_local, "recorder", None)
+    return rec if rec is not None else _session
+
+
+def phase(name):
+    """Gestionnaire de contexte mesurant la phase `name` (vide hors enregistrement)."""
+    if _session is None and not _local_count:
+        return _NULL
+    rec = active()
+    if rec is None:
+        return _NULL
+    return _Phase(rec, name)
+
+
+@contextlib.contextmanager
+def recording(callback=None, events=True, this_thread=False):
+    """
+    Active l'instrumentation le temps du bloc ; produit le Recorder.
+
+    Hors de tout enregistrement, un enregistrement (this_thread=False) couvre
+    tous les threads. Un enregistrement this_thread=True, ou ouvert alors qu'un
+    autre est déjà actif pour ce thread, ne couvre que le thread qui l'ouvre
+    (ex. une étude en arrière-plan pendant une session tracée : les rendus du
+    thread principal restent dans la session) ; à la sortie, il reverse ses
+    mesures dans l'enregistrement qui était actif pour ce thread.
+    """
+    global _session, _local_count
+    parent = active()
+    rec = Recorder(callback=callback, events=events)
+    with _lock:
+        session = not this_thread and parent is None and _session is None
+        if session:
+            _session = rec
+        else:
+            _local_count += 1
+    if not session:
+        previous = getattr(_local, "recorder", None)
+        _local.recorder = rec
+    try:
+        yield rec
+    finally:
+        if session:
+            with _lock:
+                _session = None
+        else:
+            _local.recorder = previous
+            with _lock:
+                _local_count -= 1
+        if parent is not None:
+            parent.merge(rec.state())
@@ -0,0 +1,184 @@
+import os
+import shutil
+import tempfile
+import weakref
+
+import numpy as np
+
+from model.forest import Forest, NEIGHBOR_OFFSETS
+
+
+class TiledForest:
+    """
+    Forêt n×n pour des grilles plus grandes que la mémoire vive.
+
+    - Terrain découpé en tuiles tile×tile, générées à la demande par un
+      générateur à compteur (Philox) : la tuile (ti, tj) utilise le compteur
+      (0, 0, ti, tj), elle est donc reproductible sans être stockée.
+    - État (mêmes codes que Forest) dans un fichier projeté en mémoire
+      (np.memmap) : seules les pages réellement touchées occupent de la RAM.
+    - Propagation sur le front actif seulement (comme le moteur "sparse"
+      de Forest) ; une tuile n'est générée que lorsque le feu l'atteint.
+
+    Le fichier d'état (et le répertoire temporaire s'il a été créé ici) est
+    supprimé par close(), à la sortie d'un bloc with, ou à défaut quand
+    l'objet est détruit ou à la fin du programme.
+    """
+
+    EMPTY = Forest.EMPTY
+    TREE = Forest.TREE
+    FIRE = Forest.FIRE
+    BURNED = Forest.BURNED
+
+    def __init__(self, n, density, neighbors=4, p_fire=1.0, seed=None, tile=1024, directory=None):
+        self.n = int(n)
+        self.density = float(density)
+        self.neighbors = int(neighbors)
+        self.p_fire = float(p_fire)
+        self.tile = int(tile)
+        self.nt = -(-self.n // self.tile)
+
+        ss = np.random.SeedSequence(seed)
+        self._terrain_key = ss.generate_state(2, dtype=np.uint64)
+        self.rng = np.random.default_rng(ss.spawn(1)[0])  # tirages de propagation
+
+        owned = directory is None
+        self.directory = tempfile.mkdtemp(prefix="percolation-") if owned else directory
+        self.path = os.path.join(self.directory, "state.u8")
+        self._cleanup = weakref.finalize(self, _remove_state, self.path, self.directory if owned else None)
+        self.state = np.memmap(self.path, dtype=np.int8, mode="w+", shape=(self.n, self.n))
+        self._flat = self.state.reshape(-1)
+
+        self.loaded = np.zeros((self.nt, self.nt), dtype=bool)
+        self._offsets = np.array(NEIGHBOR_OFFSETS[self.neighbors], dtype=np.int64)
+
+        self._front = np.empty(0, dtype=np.int64)
+        self._burned = 0
+        self.iteration = 0
+
+    # ---------- terrain ----------
+    def tile_bounds(self, ti, tj):
+        i0, j0 = ti * self.tile, tj * self.tile
+        return i0, min(i0 + self.tile, self.n), j0, min(j0 + self.tile, self.n)
+
+    def terrain_tile(self, ti, tj):
+        """Masque des arbres de la tuile (ti, tj), recalculé depuis le générateur à compteur."""
+        i0, i1, j0, j1 = self.tile_bounds(ti, tj)
+        bg = np.random.Philox(key=self._terrain_key, counter=[0, 0, ti, tj])
+        return np.random.Generator(bg).random((i1 - i0, j1 - j0), dtype=np.float32) < self.density
+
+    def iter_row_blocks(self):
+        """Masque des arbres du terrain complet, par bandes de `tile` lignes (sans rien stocker)."""
+        for ti in range(self.nt):
+            yield np.hstack([self.terrain_tile(ti, tj) for tj in range(self.nt)])
+
+    def _load_tile(self, ti, tj):
+        i0, i1, j0, j1 = self.tile_bounds(ti, tj)
+        self.state[i0:i1, j0:j1] = self.terrain_tile(ti, tj) * self.TREE
+        self.loaded[ti, tj] = True
+
+    def _ensure_tiles(self, flat):
+        """Génère les tuiles non encore chargées contenant les cellules `flat`."""
+        t = (flat // self.n // self.tile) * self.nt + (flat % self.n) // self.tile
+        for tid in np.unique(t).tolist():
+            ti, tj = divmod(tid, self.nt)
+            if not self.loaded[ti, tj]:
+                self._load_tile(ti, tj)
+
+    # ---------- dynamique ----------
+    def ignite_at(self, i, j):
+        """Allume le feu en (i,j) si c'est un arbre."""
+        if not (0 <= i < self.n and 0 <= j < self.n):
+            return False
+        idx = i * self.n + j
+        self._ensure_tiles(np.array([idx]))
+        if self._flat[idx] != self.TREE:
+            return False
+        self._flat[idx] = self.FIRE
+        self._front = np.append(self._front, idx)
+        return True
+
+    def is_burning(self):
+        return self._front.size > 0
+
+    def step(self):
+        """Un pas d'évolution, en O(taille du front)."""
+        front = self._front
+        if front.size == 0:
+            return False
+
+        n = self.n
+        r, c = np.divmod(front, n)
+        rr = (r[:, None] + self._offsets[:, 0]).ravel()
+        cc = (c[:, None] + self._offsets[:, 1]).ravel()
+        ok = (rr >= 0) & (rr < n) & (cc >= 0) & (cc < n)
+        cand = rr[ok] * n + cc[ok]
+
+        self._ensure_tiles(cand)
+        cand = cand[self._flat[cand] == self.TREE]
+        if self.p_fire >= 1.0:
+            ignite = np.unique(cand)
+        else:
+            cand, k = np.unique(cand, return_counts=True)
+            ignite = cand[self.rng.random(cand.size) < 1.0 - (1.0 - self.p_fire) ** k]
+
+        self._flat[front] = self.BURNED
+        self._flat[ignite] = self.FIRE
+        self._burned += front.size
+        self._front = ignite
+
+        self.iteration += 1
+        return True
+
+    def run(self):
+        while self.step():
+            pass
+
+    # ---------- métriques ----------
+    def percolates(self):
+        """Coin bas-droit atteint (feu ou brûlé)."""
+        return bool(self.state[self.n - 1, self.n - 1] in (self.FIRE, self.BURNED))
+
+    def burned_count(self):
+        return int(self._burned)
+
+    def burned_fraction(self):
+        return self._burned / float(self.n * self.n)
+
+    def time_to_extinction(self):
+        return int(self.iteration)
+
+    def tiles_loaded(self):
+        return int(np.count_nonzero(self.loaded))
+
+    # ---------- fichiers ----------
+    def flush(self):
+        self.state.flush()
+
+    def close(self, remove=True):
+        """
+        Libère la projection mémoire ; si remove, supprime le fichier d'état
+        et le répertoire temporaire créé par le constructeur.
+        remove=False : les fichiers sont conservés (y compris à la destruction).
+        """
+        self._flat = None
+        self.state = None
+        if remove:
+            self._cleanup()
+        else:
+            self._cleanup.detach()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+def _remove_state(path, directory):
+    """Suppression du fichier d'état (et du répertoire temporaire possédé)."""
+    if directory is not None:
+        shutil.rmtree(directory, ignore_errors=True)
+    elif os.path.exists(path):
+        os.remove(path)
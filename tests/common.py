@@ -0,0 +1,23 @@
+"""Utilitaires partagés par les tests."""
+import numpy as np
+
+from model.forest import Forest
+
+
+def make_forest(n, density, neighbors, p_fire, seed, **kwargs):
+    return Forest(n, density, neighbors=neighbors, p_fire=p_fire, rng=np.random.default_rng(seed), **kwargs)
+
+
+def first_tree(forest):
+    """Premier arbre du terrain (départ valide)."""
+    i, j = np.argwhere(forest.grid == Forest.TREE)[0]
+    return int(i), int(j)
+
+
+def history(forest, start):
+    """Grilles successives (état initial allumé puis après chaque pas)."""
+    forest.ignite_at(*start)
+    grids = [forest.grid.copy()]
+    while forest.step():
+        grids.append(forest.grid.copy())
+    return grids
@@ -0,0 +1,36 @@
+"""Chemin rapide à p_fire = 1 : burn_cluster identique au pas à pas, pour tous les moteurs."""
+import unittest
+
+import numpy as np
+
+from analysis.monte_carlo import run_trials
+from tests.common import first_tree, history, make_forest
+
+
+class BurnClusterTest(unittest.TestCase):
+
+    def test_burn_cluster_matches_stepping(self):
+        for neighbors in (4, 8):
+            for seed in range(3):
+                stepped = make_forest(32, 0.62, neighbors, 1.0, seed, engine="sparse", record_times=True)
+                start = first_tree(stepped)
+                history(stepped, start)
+
+                f = make_forest(32, 0.62, neighbors, 1.0, seed, record_times=True)
+                self.assertTrue(f.burn_cluster(*start))
+                np.testing.assert_array_equal(f.grid, stepped.grid)
+                np.testing.assert_array_equal(f.ignition_time, stepped.ignition_time)
+                self.assertEqual(f.iteration, stepped.iteration)
+                self.assertEqual(f.metrics(), stepped.metrics())
+
+    def test_ensemble_engine_uses_fast_path(self):
+        args = (16, 0.6, 4, 1.0, (0, 0))
+        forest = run_trials(*args, trials=30, seed=3, engine="forest")
+        ensemble = run_trials(*args, trials=30, seed=3, engine="ensemble", batch=8)
+        self.assertEqual(forest.keys(), ensemble.keys())
+        for k in forest:
+            np.testing.assert_array_equal(forest[k], ensemble[k])
+
+
+if __name__ == "__main__":
+    unittest.main()
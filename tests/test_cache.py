@@ -0,0 +1,43 @@
+"""Cache de résultats : relecture sans recalcul, invalidation par MODEL_VERSION."""
+import tempfile
+import unittest
+from unittest import mock
+
+from analysis import cache
+from analysis.cache import ResultCache
+
+CALLS = []
+
+
+def _compute(n, seed, workers=None):
+    CALLS.append((n, seed))
+    return {"value": (n, seed), "profile": {"trial": 1.0}}
+
+
+class CacheTest(unittest.TestCase):
+
+    def setUp(self):
+        CALLS.clear()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_hit_from_memory_and_disk(self):
+        c = ResultCache(self.tmp.name)
+        self.assertEqual(c.call(_compute, n=8, seed=1)["value"], (8, 1))
+        self.assertEqual(c.call(_compute, n=8, seed=1, workers=4)["value"], (8, 1))
+        self.assertEqual(ResultCache(self.tmp.name).call(_compute, n=8, seed=1),
+                         {"value": (8, 1)})
+        self.assertEqual(len(CALLS), 1)
+
+    def test_model_version_bump_invalidates(self):
+        c = ResultCache(self.tmp.name)
+        key = c.key(_compute, {"n": 8, "seed": 1})
+        c.call(_compute, n=8, seed=1)
+        with mock.patch.object(cache, "MODEL_VERSION", cache.MODEL_VERSION + 1):
+            self.assertNotEqual(c.key(_compute, {"n": 8, "seed": 1}), key)
+            ResultCache(self.tmp.name).call(_compute, n=8, seed=1)
+        self.assertEqual(len(CALLS), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+"""Amas : Hoshen–Kopelman identique à un étiquetage par parcours en largeur."""
+import unittest
+from collections import deque
+
+import numpy as np
+
+from model.forest import Forest, NEIGHBOR_OFFSETS
+from tests.common import make_forest
+from analysis.clusters import cluster_stats
+
+
+def _bfs_clusters(mask, neighbors):
+    """Tailles et bords touchés (ensemble de "TBLR") de chaque amas, par parcours en largeur."""
+    n0, n1 = mask.shape
+    seen = np.zeros(mask.shape, dtype=bool)
+    clusters = []
+    for i, j in np.argwhere(mask):
+        if seen[i, j]:
+            continue
+        seen[i, j] = True
+        queue, size, sides = deque([(i, j)]), 0, set()
+        while queue:
+            a, b = queue.popleft()
+            size += 1
+            sides |= {s for s, hit in zip("TBLR", (a == 0, a == n0 - 1, b == 0, b == n1 - 1)) if hit}
+            for di, dj in NEIGHBOR_OFFSETS[neighbors]:
+                x, y = a + di, b + dj
+                if 0 <= x < n0 and 0 <= y < n1 and mask[x, y] and not seen[x, y]:
+                    seen[x, y] = True
+                    queue.append((x, y))
+        clusters.append((size, sides))
+    return clusters
+
+
+class ClusterTest(unittest.TestCase):
+
+    def test_hoshen_kopelman_matches_bfs(self):
+        for neighbors in (4, 8):
+            for density in (0.3, 0.5, 0.6, 0.75):
+                for seed in range(3):
+                    f = make_forest(29, density, neighbors, 1.0, seed)
+                    mask = f.initial_grid == Forest.TREE
+                    stats = cluster_stats(f.initial_grid, neighbors)
+
+                    clusters = _bfs_clusters(mask, neighbors)
+                    sizes, counts = np.unique([s for s, _ in clusters], return_counts=True)
+                    got_sizes, got_counts = stats.size_distribution()
+                    np.testing.assert_array_equal(got_sizes, sizes)
+                    np.testing.assert_array_equal(got_counts, counts)
+
+                    tb = [{"T", "B"} <= sides for _, sides in clusters]
+                    lr = [{"L", "R"} <= sides for _, sides in clusters]
+                    finite = [s for (s, _), a, b in zip(clusters, tb, lr) if not (a or b)]
+                    d = stats.as_dict()
+                    self.assertEqual(d["spans_top_bottom"], any(tb))
+                    self.assertEqual(d["spans_left_right"], any(lr))
+                    self.assertEqual(d["largest"], max((s for s, _ in clusters), default=0))
+                    expected = sum(s * s for s in finite) / sum(finite) if finite else 0.0
+                    self.assertAlmostEqual(d["mean_cluster_size"], expected)
+
+                    # même résultat en flux de blocs de lignes inégaux
+                    blocks = (mask[:4], mask[4:5], mask[5:20], mask[20:])
+                    self.assertEqual(cluster_stats(iter(blocks), neighbors).as_dict(), d)
+                    self.assertEqual(cluster_stats(f.iter_row_blocks(), neighbors).as_dict(), d)
+
+
+if __name__ == "__main__":
+    unittest.main()
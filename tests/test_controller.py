@@ -0,0 +1,25 @@
+"""Contrôleur : métriques incrémentales identiques au recalcul complet."""
+import unittest
+
+from model.forest import Forest
+from controller.simulation import SimulationController
+from tests.common import first_tree, make_forest
+
+
+class ControllerTest(unittest.TestCase):
+
+    def test_incremental_metrics_match_full_recompute(self):
+        for engine in Forest.ENGINES:
+            for neighbors in (4, 8):
+                f = make_forest(20, 0.65, neighbors, 0.8, 1, engine=engine)
+                c = SimulationController(f)
+                self.assertTrue(c.ignite_at(*first_tree(f)))
+                self.assertEqual(c.metrics(), f.metrics())
+                while c.step():
+                    self.assertEqual(c.metrics(), f.metrics(), (engine, neighbors, f.iteration))
+                c.reset()
+                self.assertEqual(c.metrics(), f.metrics())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,36 @@
+"""θ(d) couplé : même loi que les essais indépendants, réalisations croissantes en densité."""
+import unittest
+
+import numpy as np
+
+from analysis.coupled import coupled_realizations
+from analysis.monte_carlo import theta_curve
+
+
+class CoupledTest(unittest.TestCase):
+
+    def test_matches_uncoupled_at_p_fire_below_1(self):
+        densities = [0.6, 0.75, 0.9]
+        for neighbors in (4, 8):
+            coupled = theta_curve(12, densities, neighbors, 0.7, (0, 0), trials=1000, seed=1, coupled=True)
+            direct = theta_curve(12, densities, neighbors, 0.7, (0, 0), trials=1000, seed=2)
+            for (d, a), (_, b) in zip(coupled, direct):
+                self.assertAlmostEqual(a, b, delta=0.08, msg=f"neighbors={neighbors} d={d}")
+
+    def test_realizations_are_monotone_in_density(self):
+        densities = [0.3, 0.45, 0.6, 0.75, 0.9]
+        for neighbors in (4, 8):
+            rngs = [np.random.default_rng(s) for s in np.random.SeedSequence(3).spawn(100)]
+            valid, percolates = coupled_realizations(10, densities, neighbors, 0.8, (0, 0), rngs)
+            self.assertTrue((percolates <= valid).all())
+            self.assertTrue((np.diff(valid.astype(int), axis=1) >= 0).all())
+            self.assertTrue((np.diff(percolates.astype(int), axis=1) >= 0).all())
+            self.assertTrue(percolates.any() and not percolates.all())
+
+    def test_start_on_corner_always_percolates(self):
+        curve = theta_curve(8, [0.2, 0.7], 4, 0.5, (7, 7), trials=50, seed=4, coupled=True)
+        self.assertEqual([t for _, t in curve], [1.0, 1.0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,27 @@
+"""Moteurs de Forest : identiques au moteur de référence "loop" à p_fire = 1."""
+import unittest
+
+import numpy as np
+
+from tests.common import first_tree, history, make_forest
+
+
+class EngineTest(unittest.TestCase):
+
+    def test_engines_match_loop_at_p_fire_1(self):
+        for neighbors in (4, 8):
+            for seed in range(3):
+                ref = make_forest(24, 0.6, neighbors, 1.0, seed, engine="loop")
+                start = first_tree(ref)
+                expected = history(ref, start)
+                for engine in ("vectorized", "sparse", "striped"):
+                    f = make_forest(24, 0.6, neighbors, 1.0, seed, engine=engine, stripes=3)
+                    grids = history(f, start)
+                    self.assertEqual(len(grids), len(expected), (engine, neighbors, seed))
+                    for g, e in zip(grids, expected):
+                        np.testing.assert_array_equal(g, e)
+                    self.assertEqual(f.iteration, ref.iteration)
+
+
+if __name__ == "__main__":
+    unittest.main()
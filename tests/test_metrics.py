@@ -0,0 +1,45 @@
+"""Métriques à la demande : arrêt anticipé sans effet sur θ, seules les clés demandées."""
+import unittest
+
+import numpy as np
+
+from analysis.monte_carlo import monte_carlo, run_trials
+
+
+class MetricsTest(unittest.TestCase):
+
+    def test_percolation_only_matches_full_run(self):
+        for p_fire in (1.0, 0.8):
+            args = (16, 0.6, 8, p_fire, (0, 0))
+            full = run_trials(*args, trials=60, seed=11)
+            fast = run_trials(*args, trials=60, seed=11, metrics=("percolates",))
+            self.assertEqual(set(fast), {"percolates"})
+            np.testing.assert_array_equal(fast["percolates"], full["percolates"], err_msg=f"p_fire={p_fire}")
+
+    def test_percolation_only_ensemble_same_theta(self):
+        # répliques d'un paquet sur un flux commun : l'arrêt anticipé décale les
+        # tirages des autres répliques, seule la loi de θ est conservée
+        args = (12, 0.85, 4, 0.8, (0, 0))
+        full = monte_carlo(*args, trials=2000, seed=11, engine="ensemble")
+        fast = monte_carlo(*args, trials=2000, seed=12, engine="ensemble", metrics=("percolates",))
+        self.assertAlmostEqual(fast["theta"], full["theta"], delta=0.07)
+
+    def test_only_requested_statistics(self):
+        args = (12, 0.6, 4, 0.8, (0, 0))
+        stats = monte_carlo(*args, trials=40, seed=1, metrics=("burned_fraction",))
+        self.assertIn("burned_mean", stats)
+        self.assertFalse(any(k.startswith(("theta", "time", "frontier")) for k in stats))
+
+        full = monte_carlo(*args, trials=40, seed=1)
+        theta = monte_carlo(*args, trials=40, seed=1, metrics=("percolates",))
+        self.assertEqual({k: v for k, v in theta.items() if k.startswith("theta")},
+                         {k: v for k, v in full.items() if k.startswith("theta")})
+
+    def test_sequential_mode_needs_percolation(self):
+        with self.assertRaises(ValueError):
+            monte_carlo(12, 0.6, 4, 0.8, (0, 0), trials=40, seed=1, target_halfwidth=0.05,
+                        metrics=("burned_fraction",))
+
+
+if __name__ == "__main__":
+    unittest.main()
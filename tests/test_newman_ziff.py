@@ -0,0 +1,31 @@
+"""Newman–Ziff : même θ(d) que le Monte-Carlo direct, poids binomiaux fenêtrés exacts."""
+import unittest
+from math import comb
+
+import numpy as np
+
+from analysis.monte_carlo import theta_curve
+from analysis.newman_ziff import binomial_weights, theta_curve_newman_ziff
+
+
+class NewmanZiffTest(unittest.TestCase):
+
+    def test_binomial_weights_match_dense(self):
+        N = 400
+        densities = (0.01, 0.3, 0.5, 0.9)
+        for d, (k0, w) in zip(densities, binomial_weights(N, densities)):
+            dense = np.array([comb(N, k) * d ** k * (1 - d) ** (N - k) for k in range(N + 1)])
+            np.testing.assert_allclose(w, dense[k0:k0 + w.size], rtol=1e-9, atol=1e-300)
+            self.assertAlmostEqual(float(w.sum()), 1.0, places=12)
+
+    def test_theta_matches_monte_carlo(self):
+        densities = [0.4, 0.55, 0.6, 0.65, 0.8]
+        for neighbors in (4, 8):
+            nz = theta_curve_newman_ziff(12, neighbors, (0, 0), realizations=1000, seed=1, densities=densities)
+            mc = theta_curve(12, densities, neighbors, 1.0, (0, 0), trials=1000, seed=2)
+            for (d, a), (_, b) in zip(nz, mc):
+                self.assertAlmostEqual(a, b, delta=0.1, msg=f"neighbors={neighbors} d={d}")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,47 @@
+"""Relecture : frame(t) identique aux grilles de la simulation, aller-retour save_run / load_run."""
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from model.forest import Forest
+from tests.common import first_tree, history, make_forest
+
+
+class ReplayTest(unittest.TestCase):
+
+    def test_frame_matches_live_grids(self):
+        for engine in Forest.ENGINES:
+            f = make_forest(20, 0.65, 8, 0.8, 2, engine=engine, record_times=True)
+            grids = history(f, first_tree(f))
+            for t, g in enumerate(grids):
+                np.testing.assert_array_equal(f.frame(t), g, err_msg=f"{engine} t={t}")
+
+    def test_load_run_restores_saved_state(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "run.npz")
+            f = make_forest(24, 0.65, 4, 1.0, 3, record_times=True)
+            f.ignite_at(*first_tree(f))
+            for _ in range(5):
+                f.step()
+            f.save_run(path)
+            saved = f.grid.copy()
+            rest = []
+            while f.step():
+                rest.append(f.grid.copy())
+
+            for engine in Forest.ENGINES:
+                g = Forest.load_run(path, engine=engine)
+                self.assertEqual(g.draws, 0, engine)  # pas de terrain tiré puis jeté
+                self.assertEqual(g.iteration, 5)
+                np.testing.assert_array_equal(g.grid, saved, err_msg=engine)
+                np.testing.assert_array_equal(g.initial_grid, f.initial_grid, err_msg=engine)
+                for t, expected in enumerate(rest):
+                    self.assertTrue(g.step())
+                    np.testing.assert_array_equal(g.grid, expected, err_msg=f"{engine} t={t}")
+                self.assertFalse(g.step())
+
+
+if __name__ == "__main__":
+    unittest.main()
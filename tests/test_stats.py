@@ -0,0 +1,44 @@
+"""Accumulateurs : paquets fusionnés (après aller-retour JSON) identiques à un seul passage."""
+import json
+import unittest
+
+import numpy as np
+
+from analysis.monte_carlo import run_trials, summarize_accumulator
+from analysis.stats import TrialAccumulator
+
+
+class AccumulatorTest(unittest.TestCase):
+
+    def test_merge_and_round_trip_match_single_pass(self):
+        res = run_trials(16, 0.6, 4, 0.8, (0, 0), trials=200, seed=5)
+        single = TrialAccumulator().update(res, trials_run=200)
+
+        merged = TrialAccumulator()
+        for a, b in ((0, 17), (17, 120), (120, len(res["percolates"]))):
+            part = TrialAccumulator().update({k: v[a:b] for k, v in res.items()})
+            saved = json.loads(json.dumps(part.to_dict()))
+            merged.merge(TrialAccumulator.from_dict(saved))
+        merged.trials_run = 200
+
+        for name in ("trials_run", "trials_used", "percolation", "successes"):
+            self.assertEqual(getattr(merged, name), getattr(single, name), name)
+        np.testing.assert_array_equal(merged.burned_hist.counts, single.burned_hist.counts)
+        np.testing.assert_array_equal(merged.time_hist.counts, single.time_hist.counts)
+        for name in ("burned", "time", "frontier"):
+            m, s = getattr(merged, name), getattr(single, name)
+            self.assertEqual(m.count, s.count, name)
+            self.assertAlmostEqual(m.mean, s.mean, places=10, msg=name)
+            self.assertAlmostEqual(m.variance, s.variance, places=10, msg=name)
+        self.assertAlmostEqual(single.burned.mean, float(np.mean(res["burned_fraction"])), places=12)
+        self.assertAlmostEqual(single.time.variance, float(np.var(res["time"])), places=9)
+
+        expected = summarize_accumulator(single)
+        got = summarize_accumulator(merged)
+        self.assertEqual(got.keys(), expected.keys())
+        for k in expected:
+            self.assertAlmostEqual(got[k], expected[k], places=10, msg=k)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+"""Balayage : la reprise ne recalcule pas les paquets terminés et redonne le même résultat."""
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from analysis import sweep
+
+SPEC = {"n": 8, "densities": [0.5, 0.7], "p_fire": 0.8, "trials": 20, "seed": 1, "chunk": 5}
+
+
+class Interrupted(Exception):
+    pass
+
+
+def _counting(limit=None):
+    """run_trials qui compte ses appels et s'interrompt au-delà de limit."""
+    calls, real = [], sweep.run_trials
+
+    def run_trials(*args, **kwargs):
+        if limit is not None and len(calls) == limit:
+            raise Interrupted
+        calls.append(args)
+        return real(*args, **kwargs)
+
+    return run_trials, calls
+
+
+def _read(path):
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+class SweepTest(unittest.TestCase):
+
+    def test_resume_skips_finished_chunks(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            full, resumed = os.path.join(tmp, "full"), os.path.join(tmp, "resumed")
+            expected = _read(sweep.run_sweep(SPEC, full, log=lambda *a: None))
+
+            fake, calls = _counting(limit=3)
+            with mock.patch.object(sweep, "run_trials", fake), self.assertRaises(Interrupted):
+                sweep.run_sweep(SPEC, resumed, log=lambda *a: None)
+
+            fake, calls = _counting()
+            with mock.patch.object(sweep, "run_trials", fake):
+                csv_path = sweep.run_sweep(SPEC, resumed, log=lambda *a: None)
+            self.assertEqual(len(calls), 2 * 4 - 3)
+            self.assertEqual(_read(csv_path), expected)
+
+            fake, calls = _counting()
+            with mock.patch.object(sweep, "run_trials", fake):
+                sweep.run_sweep(SPEC, resumed, log=lambda *a: None)
+            self.assertEqual(calls, [])
+            self.assertEqual(_read(csv_path), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,37 @@
+"""TiledForest : même propagation que Forest sur le même terrain (p_fire = 1)."""
+import unittest
+
+import numpy as np
+
+from model.forest import Forest
+from model.tiled import TiledForest
+
+
+class TiledTest(unittest.TestCase):
+
+    def test_matches_forest_on_same_terrain(self):
+        for neighbors in (4, 8):
+            for seed in range(3):
+                with TiledForest(40, 0.6, neighbors=neighbors, seed=seed, tile=8) as t:
+                    trees = np.vstack(list(t.iter_row_blocks()))
+                    f = Forest(40, 0.6, neighbors=neighbors, p_fire=1.0,
+                               tree_bits=np.packbits(trees, axis=1))
+                    np.testing.assert_array_equal(f.grid == Forest.TREE, trees)
+
+                    i, j = (int(x) for x in np.argwhere(trees)[0])
+                    self.assertTrue(t.ignite_at(i, j))
+                    self.assertTrue(f.ignite_at(i, j))
+                    t.run()
+                    while f.step():
+                        pass
+
+                    msg = f"neighbors={neighbors} seed={seed}"
+                    self.assertEqual(t.burned_count(), f.metrics()["burned_count"], msg)
+                    self.assertEqual(t.percolates(), f.metrics()["percolates"], msg)
+                    self.assertEqual(t.time_to_extinction(), f.time_to_extinction(), msg)
+                    loaded = np.repeat(np.repeat(t.loaded, 8, axis=0), 8, axis=1)
+                    np.testing.assert_array_equal(np.asarray(t.state)[loaded], f.grid[loaded], msg)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,25 @@
+"""Monte-Carlo : résultats indépendants du nombre de processus."""
+import unittest
+
+import numpy as np
+
+from analysis.monte_carlo import monte_carlo, run_trials
+
+
+class WorkersTest(unittest.TestCase):
+
+    def test_results_do_not_depend_on_workers(self):
+        for engine in ("forest", "ensemble"):
+            args = (16, 0.62, 4, 0.8, (0, 0))
+            serial = run_trials(*args, trials=40, seed=7, engine=engine, batch=8, workers=1)
+            pooled = run_trials(*args, trials=40, seed=7, engine=engine, batch=8, workers=2)
+            self.assertEqual(serial.keys(), pooled.keys())
+            for k in serial:
+                np.testing.assert_array_equal(serial[k], pooled[k])
+
+            self.assertEqual(monte_carlo(*args, trials=40, seed=7, engine=engine, batch=8, workers=1),
+                             monte_carlo(*args, trials=40, seed=7, engine=engine, batch=8, workers=2))
+
+
+if __name__ == "__main__":
+    unittest.main()
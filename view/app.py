@@ -1,15 +1,26 @@
 import tkinter as tk
-from tkinter import ttk
+from tkinter import ttk, filedialog
 
 import numpy as np
 
+from model import instrumentation
 from model.forest import Forest
 from controller.simulation import SimulationController
-from analysis.monte_carlo import monte_carlo, theta_curve
+from analysis.monte_carlo import adaptive_theta_curve
+from analysis.newman_ziff import theta_curve_newman_ziff
+from analysis.study import StudyWorker
+from analysis.cache import ResultCache
 
 
 class FeuForetApp(tk.Tk):
     COLOR = {0: "white", 1: "green", 2: "red", 3: "black"}
+    # mêmes couleurs en RGB, indexées par état (table de correspondance pour l'image)
+    COLOR_RGB = np.array([[255, 255, 255], [0, 128, 0], [255, 0, 0], [0, 0, 0]], dtype=np.uint8)
+
+    SIZES = (32, 64, 128, 256, 512, 1024)
+    # côté maximal du canvas : le zoom est réduit pour les grandes grilles
+    # (une case reste au moins 1 px, donc 1024² s'affiche en 1024 px)
+    MAX_CANVAS_PX = 768
 
     def __init__(self):
         super().__init__()
@@ -18,18 +29,27 @@ class FeuForetApp(tk.Tk):
 
         # simulation
         self.n = 32
-        self.canvas_px = 384
-        self.cell_px = self.canvas_px // self.n
+        self.cell_px = 12
+        self.canvas_px = self.n * self.cell_px
+
+        # rendu : une seule image (PhotoImage) sur le canvas
+        self._photo = None
+        self._image_item = None
 
         self.after_id = None
         self.running = False
 
+        # relecture : pas affiché (None = état courant de la simulation)
+        self._view_time = None
+
         self.start_cell = None
         self.forest = None
         self.controller = None
 
-        # terrain figé pour restart
-        self._fixed_initial_grid = None
+        # étude en arrière-plan
+        self.study_worker = None
+        self._study_stats = None
+        self.cache = ResultCache()
 
         self._build_ui()
         self._new_world()
@@ -96,9 +116,25 @@ class FeuForetApp(tk.Tk):
         e.grid(row=0, column=2, padx=(5, 0))
         e.bind("<Return>", lambda _=None: self._new_world())
 
+        # Taille de grille / zoom
+        ttk.Label(self.tab_params, text="Affichage").grid(row=8, column=0, sticky="w", pady=(10, 0))
+        view_box = ttk.Frame(self.tab_params)
+        view_box.grid(row=9, column=0, sticky="w")
+
+        self.size_var = tk.IntVar(value=self.n)
+        ttk.Label(view_box, text="n :").grid(row=0, column=0)
+        size_box = ttk.Combobox(view_box, textvariable=self.size_var, values=self.SIZES, width=6, state="readonly")
+        size_box.grid(row=0, column=1, padx=(5, 10))
+        size_box.bind("<<ComboboxSelected>>", lambda _=None: self._resize_world())
+
+        self.zoom_var = tk.IntVar(value=self.cell_px)
+        ttk.Label(view_box, text="Zoom (px/case) :").grid(row=0, column=2)
+        ttk.Spinbox(view_box, from_=1, to=16, textvariable=self.zoom_var, width=4,
+                    command=self._resize_world).grid(row=0, column=3, padx=(5, 0))
+
         # Controls
         ctrl = ttk.Frame(self.tab_params)
-        ctrl.grid(row=8, column=0, sticky="w", pady=(12, 0))
+        ctrl.grid(row=10, column=0, sticky="w", pady=(12, 0))
         self.btn_start = ttk.Button(ctrl, text="Start", command=self.start)
         self.btn_pause = ttk.Button(ctrl, text="Pause", command=self.pause)
         self.btn_play = ttk.Button(ctrl, text="Play", command=self.play)
@@ -110,9 +146,23 @@ class FeuForetApp(tk.Tk):
         self.btn_restart.grid(row=0, column=3)
 
         ttk.Label(self.tab_params, text="(clic gauche) choisir départ | (clic droit) enlever départ").grid(
-            row=9, column=0, sticky="w", pady=(10, 0)
+            row=11, column=0, sticky="w", pady=(10, 0)
         )
 
+        # Relecture : n'importe quel pas est recalculé depuis les temps d'allumage
+        ttk.Label(self.tab_params, text="Relecture").grid(row=12, column=0, sticky="w", pady=(10, 0))
+        self.time_scale = ttk.Scale(self.tab_params, from_=0, to=0, command=self._on_scrub)
+        self.time_scale.grid(row=13, column=0, sticky="we")
+
+        replay_box = ttk.Frame(self.tab_params)
+        replay_box.grid(row=14, column=0, sticky="w", pady=(4, 0))
+        self.speed_var = tk.StringVar(value="1")
+        ttk.Label(replay_box, text="Vitesse (pas/image) :").grid(row=0, column=0)
+        ttk.Spinbox(replay_box, values=(1, 2, 4, 8, 16, 32), textvariable=self.speed_var,
+                    width=4).grid(row=0, column=1, padx=(5, 10))
+        ttk.Button(replay_box, text="Enregistrer", command=self.save_run).grid(row=0, column=2, padx=(0, 8))
+        ttk.Button(replay_box, text="Charger", command=self.load_run).grid(row=0, column=3)
+
         # ----- Study tab -----
         self.trials = tk.IntVar(value=200)
         ttk.Label(self.tab_study, text="Nombre de simulations (Monte-Carlo)").grid(row=0, column=0, sticky="w")
@@ -121,14 +171,22 @@ class FeuForetApp(tk.Tk):
         self.trials_label.grid(row=2, column=0, sticky="w")
         self._update_trials_label()
 
-        self.btn_study = ttk.Button(self.tab_study, text="Lancer étude (θ(d) + stats)", command=self.run_study)
-        self.btn_study.grid(row=3, column=0, sticky="we", pady=(10, 0))
+        study_box = ttk.Frame(self.tab_study)
+        study_box.grid(row=3, column=0, sticky="we", pady=(10, 0))
+        study_box.columnconfigure(0, weight=1)
+        self.btn_study = ttk.Button(study_box, text="Lancer étude (θ(d) + stats)", command=self.run_study)
+        self.btn_study.grid(row=0, column=0, sticky="we")
+        self.btn_cancel = ttk.Button(study_box, text="Annuler", command=self.cancel_study, state="disabled")
+        self.btn_cancel.grid(row=0, column=1, padx=(8, 0))
+
+        self.study_status = ttk.Label(self.tab_study, text="")
+        self.study_status.grid(row=4, column=0, sticky="w", pady=(6, 0))
 
         self.study_canvas = tk.Canvas(self.tab_study, width=420, height=260, bg="white")
-        self.study_canvas.grid(row=4, column=0, pady=(10, 0))
+        self.study_canvas.grid(row=5, column=0, pady=(10, 0))
 
         self.study_text = tk.Text(self.tab_study, width=58, height=10)
-        self.study_text.grid(row=5, column=0, pady=(10, 0))
+        self.study_text.grid(row=6, column=0, pady=(10, 0))
 
     def _update_trials_label(self):
         self.trials_label.config(text=f"{int(self.trials.get())} simulations")
@@ -155,17 +213,40 @@ class FeuForetApp(tk.Tk):
             neighbors=self.neighbors.get(),
             p_fire=self.p_fire.get(),
             rng=rng,
+            engine="sparse",
+            record_times=True,
         )
-        self._fixed_initial_grid = self.forest.snapshot_for_restart()
         self.controller = SimulationController(self.forest)
 
         # reset start selection
         self.start_cell = None
         self.running = False
+        self._view_time = None
 
         self.draw()
         self._update_sim_info()
 
+    def _resize_world(self):
+        """Applique la taille de grille et le zoom choisis (nouveau terrain)."""
+        try:
+            n = int(self.size_var.get())
+            zoom = max(1, min(16, int(self.zoom_var.get())))
+        except (tk.TclError, ValueError):
+            return
+        if n == self.n and zoom == self.cell_px:
+            return
+
+        self._set_view(n, zoom)
+        self._new_world()
+
+    def _set_view(self, n, zoom):
+        """Taille de grille n et zoom, borné pour que le canvas reste ≤ MAX_CANVAS_PX."""
+        self.n = n
+        self.cell_px = max(1, min(zoom, self.MAX_CANVAS_PX // n))
+        self.zoom_var.set(self.cell_px)
+        self.canvas_px = self.n * self.cell_px
+        self.canvas.config(width=self.canvas_px, height=self.canvas_px)
+
     def restart(self):
         """
         Restart = même terrain (même initial_grid) remis à zéro,
@@ -174,12 +255,11 @@ class FeuForetApp(tk.Tk):
         self.pause()
         self.running = False
 
-        # remet terrain initial figé
-        self.forest.initial_grid = self._fixed_initial_grid.copy()
-        self.forest.reset()
-        self.controller = SimulationController(self.forest)
+        # la forêt garde son terrain initial (masque compacté) : reset() suffit
+        self.controller.reset()
 
         self.start_cell = None
+        self._view_time = None
         self.draw()
         self._update_sim_info()
 
@@ -214,9 +294,10 @@ class FeuForetApp(tk.Tk):
             return
 
         # toujours repartir d'une forêt "propre" au start :
-        self.forest.reset()
+        self._view_time = None
+        self.controller.reset()
         i0, j0 = self.start_cell
-        ok = self.forest.ignite_at(i0, j0)
+        ok = self.controller.ignite_at(i0, j0)
         if not ok:
             return
 
@@ -226,8 +307,8 @@ class FeuForetApp(tk.Tk):
     def play(self):
         if self.running:
             return
-        # reprend seulement si déjà allumé (il y a du feu)
-        if np.any(self.forest.grid == self.forest.FIRE):
+        # reprend la relecture, ou la simulation si déjà allumée (il y a du feu)
+        if self._view_time is not None or self.forest.is_burning():
             self.running = True
             self._loop()
 
@@ -240,11 +321,28 @@ class FeuForetApp(tk.Tk):
                 pass
             self.after_id = None
 
+    def _speed(self):
+        try:
+            return max(1, int(self.speed_var.get()))
+        except (tk.TclError, ValueError):
+            return 1
+
     def _loop(self):
         if not self.running:
             return
 
-        alive = self.controller.step()
+        speed = self._speed()
+        if self._view_time is not None:
+            # relecture : aucun calcul, on avance dans les pas déjà simulés
+            self._view_time += speed
+            if self._view_time >= self.forest.iteration:
+                self._view_time = None
+            alive = True
+        else:
+            for _ in range(speed):
+                alive = self.controller.step()
+                if not alive:
+                    break
         self.draw()
         self._update_sim_info()
 
@@ -256,22 +354,36 @@ class FeuForetApp(tk.Tk):
 
     # ---------------- Drawing & Info ----------------
     def draw(self):
-        self.canvas.delete("all")
-        g = self.forest.grid
+        """
+        Rendu de la grille en une seule image : table de couleurs appliquée
+        au tableau NumPy, agrandie au zoom, puis envoyée à Tk en PPM binaire.
+        (Le canvas ne contient que deux objets : l'image et le cadre du départ.)
+        """
+        with instrumentation.phase("draw"):
+            self._draw()
+
+    def _draw(self):
         p = self.cell_px
 
-        for i in range(self.n):
-            x0 = i * p
-            x1 = x0 + p
-            for j in range(self.n):
-                y0 = j * p
-                y1 = y0 + p
-                self.canvas.create_rectangle(x0, y0, x1, y1, fill=self.COLOR[int(g[i, j])], outline="")
+        grid = self.forest.grid if self._view_time is None else self.forest.frame(self._view_time)
+
+        # grid[i, j] est affiché en (x = i, y = j) : l'image est la transposée
+        rgb = self.COLOR_RGB[grid.T]
+        if p > 1:
+            rgb = rgb.repeat(p, axis=0).repeat(p, axis=1)
+        h, w = rgb.shape[:2]
+        self._photo = tk.PhotoImage(data=b"P6 %d %d 255 " % (w, h) + rgb.tobytes(), format="PPM")
+
+        if self._image_item is None:
+            self._image_item = self.canvas.create_image(0, 0, anchor="nw", image=self._photo)
+        else:
+            self.canvas.itemconfig(self._image_item, image=self._photo)
 
         # highlight start
+        self.canvas.delete("start")
         if self.start_cell is not None:
             i, j = self.start_cell
-            self.canvas.create_rectangle(i*p, j*p, (i+1)*p, (j+1)*p, outline="blue", width=2)
+            self.canvas.create_rectangle(i*p, j*p, (i+1)*p, (j+1)*p, outline="blue", width=2, tags="start")
 
     def _update_sim_info(self):
         m = self.controller.metrics()
@@ -283,8 +395,49 @@ class FeuForetApp(tk.Tk):
             f"Percolation (coin bas-droit atteint) : {'Oui' if m['percolates'] else 'Non'}\n"
             f"État : {'en cours' if self.running else 'arrêt'}"
         )
+        if self._view_time is not None:
+            txt += f"\nRelecture : pas {self._view_time} / {m['iteration']}"
         self.sim_info.config(text=txt)
 
+        # curseur de relecture : de 0 au dernier pas simulé
+        self.time_scale.config(to=m["iteration"])
+        self.time_scale.set(m["iteration"] if self._view_time is None else self._view_time)
+
+    # ---------------- Relecture ----------------
+    def _on_scrub(self, value):
+        t = int(round(float(value)))
+        if t == (self.forest.iteration if self._view_time is None else self._view_time):
+            return  # mise à jour du curseur par _update_sim_info
+        self.pause()
+        self._view_time = t if t < self.forest.iteration else None
+        self.draw()
+        self._update_sim_info()
+
+    def save_run(self):
+        path = filedialog.asksaveasfilename(defaultextension=".npz", filetypes=[("Exécution", "*.npz")])
+        if path:
+            self.forest.save_run(path)
+
+    def load_run(self):
+        path = filedialog.askopenfilename(filetypes=[("Exécution", "*.npz")])
+        if not path:
+            return
+        self.pause()
+        forest = Forest.load_run(path, engine="sparse")
+
+        self._set_view(forest.n, self.cell_px)
+        self.size_var.set(forest.n)
+        self.density.set(forest.density)
+        self.neighbors.set(forest.neighbors)
+        self.p_fire.set(forest.p_fire)
+
+        self.forest = forest
+        self.controller = SimulationController(forest)
+        self.start_cell = None
+        self._view_time = 0
+        self.draw()
+        self._update_sim_info()
+
     # ---------------- Study mode ----------------
     def run_study(self):
         if self.start_cell is None:
@@ -292,9 +445,6 @@ class FeuForetApp(tk.Tk):
 
         trials = int(self.trials.get())
 
-        # densités fines pour courbe lisse
-        densities = [round(x, 3) for x in np.linspace(0.1, 0.95, 18)]
-
         # seed : si fixe → reproductible
         seed = None
         if self.seed_fixed.get():
@@ -304,29 +454,89 @@ class FeuForetApp(tk.Tk):
                 seed = 1234
 
         # courbe theta(d)
-        curve = theta_curve(
-            n=self.n,
-            densities=densities,
-            neighbors=self.neighbors.get(),
-            p_fire=self.p_fire.get(),
-            start_cell=self.start_cell,
-            trials=trials,
-            seed=seed
-        )
+        if self.p_fire.get() >= 1.0:
+            # percolation de site : courbe continue en un seul balayage (Newman–Ziff)
+            curve_func = theta_curve_newman_ziff
+            curve_kwargs = dict(
+                n=self.n,
+                neighbors=self.neighbors.get(),
+                start_cell=self.start_cell,
+                realizations=trials,
+                seed=seed,
+            )
+        else:
+            # densités raffinées autour de la transition, budget d'une grille de 18 points
+            curve_func = adaptive_theta_curve
+            curve_kwargs = dict(
+                n=self.n,
+                neighbors=self.neighbors.get(),
+                p_fire=self.p_fire.get(),
+                start_cell=self.start_cell,
+                budget=18 * trials,
+                seed=seed,
+                engine="ensemble",
+            )
 
         # stats détaillées pour la densité courante (celle du slider)
-        stats = monte_carlo(
+        stats_kwargs = dict(
             n=self.n,
             density=float(self.density.get()),
             neighbors=self.neighbors.get(),
             p_fire=self.p_fire.get(),
             start_cell=self.start_cell,
             trials=trials,
-            seed=seed
+            seed=seed,
+            engine="ensemble",
+            profile=True,
         )
 
-        self._draw_curve(curve)
-        self._write_stats(stats)
+        # calcul dans un thread : la fenêtre reste réactive
+        self.cancel_study()
+        self._study_stats = None
+        self.study_worker = StudyWorker(curve_func, curve_kwargs, stats_kwargs, cache=self.cache)
+        self.study_worker.start()
+
+        self.btn_study.config(state="disabled")
+        self.btn_cancel.config(state="normal")
+        self.study_status.config(text="Étude en cours…")
+        self.after(100, self._poll_study, self.study_worker)
+
+    def cancel_study(self):
+        if self.study_worker is not None:
+            self.study_worker.cancel()
+
+    def _poll_study(self, worker):
+        if worker is not self.study_worker:
+            return
+
+        finished = False
+        while not worker.events.empty():
+            ev = worker.events.get_nowait()
+            kind = ev[0]
+            if kind == "stats":
+                self._study_stats = ev[1]
+                self._write_stats(ev[1])
+            elif kind == "curve":
+                self._draw_curve(ev[1])
+                self.study_status.config(text=f"Étude en cours… {len(ev[1])} points")
+            elif kind == "done":
+                self._draw_curve(ev[1])
+                self._write_stats(self._study_stats, ev[2])
+                self.study_status.config(text="Étude terminée")
+                finished = True
+            elif kind == "cancelled":
+                self.study_status.config(text="Étude annulée")
+                finished = True
+            elif kind == "error":
+                self.study_status.config(text=f"Erreur : {ev[1]}")
+                finished = True
+
+        if finished:
+            self.study_worker = None
+            self.btn_study.config(state="normal")
+            self.btn_cancel.config(state="disabled")
+        else:
+            self.after(100, self._poll_study, worker)
 
     def _draw_curve(self, curve):
         c = self.study_canvas
@@ -345,10 +555,15 @@ class FeuForetApp(tk.Tk):
         c.create_text(w//2, h - 12, text="d (densité)")
         c.create_text(14, h//2, text="θ(d)", angle=90)
 
+        if len(curve) < 2:
+            return
+
         xs = [d for d, _ in curve]
         ys = [p for _, p in curve]
 
         dmin, dmax = min(xs), max(xs)
+        if dmax <= dmin:
+            return
 
         def X(d):
             return margin + int((d - dmin) / (dmax - dmin) * (w - 2*margin))
@@ -356,11 +571,13 @@ class FeuForetApp(tk.Tk):
         def Y(p):
             return (h - margin) - int(p * (h - 2*margin))
 
-        # points + lines
+        # points + lines (courbe dense : pas de marqueurs)
+        markers = len(curve) <= 40
         prev = None
         for d, p in curve:
             x, y = X(d), Y(p)
-            c.create_oval(x-3, y-3, x+3, y+3, fill="red", outline="")
+            if markers:
+                c.create_oval(x-3, y-3, x+3, y+3, fill="red", outline="")
             if prev is not None:
                 c.create_line(prev[0], prev[1], x, y)
             prev = (x, y)
@@ -372,7 +589,7 @@ class FeuForetApp(tk.Tk):
             c.create_line(margin-4, y, margin+4, y)
             c.create_text(margin-18, y, text=f"{p:.1f}")
 
-    def _write_stats(self, stats):
+    def _write_stats(self, stats, d_c=None):
         t = self.study_text
         t.delete("1.0", "end")
 
@@ -391,6 +608,21 @@ class FeuForetApp(tk.Tk):
 
         t.insert("end", f"Résultats (Monte-Carlo)\n")
         t.insert("end", f"θ(d) = P(percolation) ≈ {stats['theta']:.3f}  (~ {stats['theta']*100:.1f} %)\n")
+        t.insert("end", f"IC 95 % (Wilson) : [{stats['theta_ci_low']:.3f} ; {stats['theta_ci_high']:.3f}]\n")
         t.insert("end", f"moyenne brûlé ≈ {stats['burned_mean']*100:.1f} %   | variance ≈ {stats['burned_var']:.4f}\n")
         t.insert("end", f"temps moyen ≈ {stats['time_mean']:.1f} itérations | variance ≈ {stats['time_var']:.2f}\n")
         t.insert("end", f"frontière moyenne ≈ {stats['frontier_mean']:.1f}   | variance ≈ {stats['frontier_var']:.2f}\n")
+        t.insert("end", f"brûlé 5 / 50 / 95 % : {stats['burned_q05']*100:.1f} / {stats['burned_q50']*100:.1f} / {stats['burned_q95']*100:.1f} %\n")
+        t.insert("end", f"temps 5 / 50 / 95 % : {stats['time_q05']:.0f} / {stats['time_q50']:.0f} / {stats['time_q95']:.0f} itérations\n")
+        if d_c is not None:
+            t.insert("end", f"densité critique estimée d_c ≈ {d_c:.3f}\n")
+
+        if "profile" not in stats:
+            # l'étude demande toujours profile=True : seul un résultat relu du cache n'en a pas
+            t.insert("end", f"\nCoût par phase : statistiques relues du cache, non mesuré\n")
+        else:
+            phases = stats["profile"]["phases"]
+            t.insert("end", f"\nCoût par phase (stats)\n")
+            for name in ("monte_carlo", "terrain", "ensemble_run", "trial", "step", "metrics"):
+                if name in phases:
+                    t.insert("end", f"- {name} : {phases[name]['seconds']*1000:.0f} ms ({phases[name]['count']} appels)\n")